@@ -0,0 +1,88 @@
+"""Cost of formatting responses where most resolvers fail.
+
+Run with ``python -m benchmarks.bench_errors``.
+"""
+import logging
+import timeit
+
+from graphql import graphql
+from graphql.type.definition import GraphQLField, GraphQLList, GraphQLObjectType
+from graphql.type.scalars import GraphQLString
+from graphql.type.schema import GraphQLSchema
+from graphql_server import default_format_error, json_encode
+
+from quart_graphql.errors import ErrorPipeline
+from quart_graphql.middleware import compile_middleware
+
+ROWS = 1000
+
+
+def resolve_broken(obj, info):
+    raise Exception("Upstream unavailable")
+
+
+Row = GraphQLObjectType(
+    name="Row", fields={"broken": GraphQLField(GraphQLString, resolver=resolve_broken)}
+)
+
+Schema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "rows": GraphQLField(GraphQLList(Row), resolver=lambda *_: [{}] * ROWS)
+        },
+    )
+)
+
+QUERY = "{ rows { broken } }"
+
+
+def run_default():
+    result = graphql(Schema, QUERY)
+    return json_encode(
+        {
+            "errors": [default_format_error(e) for e in result.errors],
+            "data": result.data,
+        }
+    )
+
+
+def make_pipeline_run():
+    pipeline = ErrorPipeline(traceback_sample_rate=0.01)
+    middleware = compile_middleware([pipeline])
+
+    def run():
+        result = graphql(Schema, QUERY, middleware=middleware)
+        return json_encode(
+            {"errors": pipeline.format_errors(result.errors), "data": result.data}
+        )
+
+    return run
+
+
+def measure(run, number=5, repeat=3):
+    return min(timeit.repeat(run, number=number, repeat=repeat)) / number
+
+
+def main():
+    # graphql-core logs every resolver error, keep that off the terminal while
+    # still paying for the records being created.
+    logging.getLogger("graphql").addHandler(logging.NullHandler())
+    logging.getLogger("graphql").propagate = False
+
+    default = measure(run_default)
+    pipeline_run = make_pipeline_run()
+    pipeline = measure(pipeline_run)
+    print("failing resolvers per query: %d" % ROWS)
+    print(
+        "default formatting:          %.2f ms/query (%d bytes)"
+        % (default * 1e3, len(run_default()))
+    )
+    print(
+        "error pipeline:              %.2f ms/query (%d bytes)"
+        % (pipeline * 1e3, len(pipeline_run()))
+    )
+
+
+if __name__ == "__main__":
+    main()
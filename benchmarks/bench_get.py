@@ -0,0 +1,114 @@
+"""Dispatching a small cached query through the view.
+
+Compares GET requests, which are read from the query string only, with GET
+requests read the way the view did before (awaiting the empty body and
+looking every parameter up through the request proxy) and with the same
+query POSTed as JSON. The view is called repeatedly inside one Quart test
+request context, so the numbers leave out the ASGI layer and building the
+request.
+
+Run with ``python -m benchmarks.bench_get``.
+"""
+import asyncio
+import json
+import time
+from urllib.parse import urlencode
+
+from graphql.type.definition import GraphQLArgument, GraphQLField, GraphQLObjectType
+from graphql.type.scalars import GraphQLString
+from graphql.type.schema import GraphQLSchema
+from quart import Quart, request
+
+from quart_graphql import AsyncGraphQLView
+from quart_graphql.cache import MemoryCache
+
+REQUESTS = 2000
+
+Schema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "hello": GraphQLField(
+                GraphQLString,
+                args={"who": GraphQLArgument(GraphQLString)},
+                resolver=lambda obj, info, who="World": "Hello %s" % who,
+            )
+        },
+    )
+)
+
+QUERY = "query Hello($who: String) { hello(who: $who) }"
+VARIABLES = '{"who": "GET"}'
+
+
+class BodyParsingView(AsyncGraphQLView):
+    # The previous GET path.
+    async def read_request(self, request_method):
+        data = await self.parse_body()
+        self.query_data = None
+        show_graphiql = request_method == "get" and self.should_display_graphiql()
+        return data, request.args, show_graphiql
+
+
+def create_app(view_class=AsyncGraphQLView):
+    app = Quart(__name__)
+    app.add_url_rule(
+        "/graphql",
+        view_func=view_class.as_view(
+            "graphql",
+            schema=Schema,
+            document_cache=MemoryCache(),
+            cache_variables=True,
+        ),
+    )
+    return app
+
+
+async def measure(app, context, number=REQUESTS):
+    view = app.view_functions["graphql"]
+    async with context:
+        started = time.perf_counter()
+        for _ in range(number):
+            response = await view()
+        elapsed = time.perf_counter() - started
+    assert response.status_code == 200, response.status_code
+    return elapsed / number
+
+
+async def run(repeat=10):
+    app = create_app()
+    body_parsing_app = create_app(BodyParsingView)
+    path = "/graphql?" + urlencode({"query": QUERY, "variables": VARIABLES})
+    body = json.dumps({"query": QUERY, "variables": json.loads(VARIABLES)})
+
+    post_context = app.test_request_context(
+        "/graphql", method="POST", headers={"Content-Type": "application/json"}
+    )
+    post_context.request.body.set_result(body.encode("utf8"))
+    cases = [
+        ("GET", app, app.test_request_context(path, method="GET")),
+        (
+            "GET, body parsing",
+            body_parsing_app,
+            body_parsing_app.test_request_context(path, method="GET"),
+        ),
+        ("POST", app, post_context),
+    ]
+
+    # Rounds alternate between the cases, so drift affects them alike.
+    timings = {name: [] for name, _, _ in cases}
+    for _ in range(repeat):
+        for name, case_app, context in cases:
+            timings[name].append(await measure(case_app, context))
+    for name, _, _ in cases:
+        print(
+            "{:<19}{:8.1f} us per request".format(name + ":", min(timings[name]) * 1e6)
+        )
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
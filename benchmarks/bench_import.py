@@ -0,0 +1,59 @@
+"""Time to import the package in a fresh interpreter.
+
+Each statement runs in a new Python process, so nothing is cached in
+``sys.modules``; the best of several runs is reported, together with the
+modules the statement ended up loading.
+
+Run with ``python -m benchmarks.bench_import``.
+"""
+import subprocess
+import sys
+
+RUNS = 7
+
+STATEMENTS = [
+    "import quart_graphql",
+    "import quart_graphql.assets",
+    "from quart_graphql import AsyncGraphQLView",
+    "from quart_graphql import GraphQL",
+]
+
+MODULES = [
+    "quart",
+    "graphql",
+    "graphql_server",
+    "quart_graphql.graphqlview",
+    "quart_graphql.render_graphiql",
+    "quart_graphql.blueprint",
+]
+
+SCRIPT = """
+import sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(elapsed)
+print(" ".join(name for name in {modules!r} if name in sys.modules))
+"""
+
+
+def measure(statement, runs=RUNS):
+    timings = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, "-c", SCRIPT.format(statement=statement, modules=MODULES)]
+        )
+        elapsed, loaded = output.decode("utf8").split("\n")[:2]
+        timings.append(float(elapsed))
+    return min(timings), loaded.split()
+
+
+def main():
+    for statement in STATEMENTS:
+        elapsed, loaded = measure(statement)
+        print("{:45s} {:8.1f} ms".format(statement + ":", elapsed * 1e3))
+        print("{:45s} {}".format("", ", ".join(loaded) or "-"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Per-field cost of resolver middleware.
+
+All fields of the query have resolvers, so the pass-through middleware runs
+for every one of them, through graphql-core's ``MiddlewareManager`` or the
+chain compiled once by ``CompiledMiddleware``.
+
+Run with ``python -m benchmarks.bench_middleware``.
+"""
+import timeit
+
+from graphql import graphql
+from graphql.type.definition import GraphQLField, GraphQLList, GraphQLObjectType
+from graphql.type.scalars import GraphQLInt, GraphQLString
+from graphql.type.schema import GraphQLSchema
+
+from quart_graphql.middleware import compile_middleware
+
+ROWS = 500
+COLUMNS = 10
+
+
+def create_resolver(name):
+    # Every field has its own resolver, so the middleware chain runs for each
+    # of them as it would for fields backed by a database or a service.
+    def resolve(obj, info):
+        return obj[name]
+
+    return resolve
+
+
+Row = GraphQLObjectType(
+    name="Row",
+    fields={
+        "field%d"
+        % column: GraphQLField(
+            GraphQLString, resolver=create_resolver("field%d" % column)
+        )
+        for column in range(COLUMNS - 1)
+    },
+)
+Row.fields["id"] = GraphQLField(GraphQLInt, resolver=create_resolver("id"))
+
+Schema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "rows": GraphQLField(
+                GraphQLList(Row),
+                resolver=lambda *_: [
+                    dict(
+                        {"field%d" % column: "value" for column in range(COLUMNS - 1)},
+                        id=row,
+                    )
+                    for row in range(ROWS)
+                ],
+            )
+        },
+    )
+)
+
+QUERY = "{ rows { id %s } }" % " ".join(
+    "field%d" % column for column in range(COLUMNS - 1)
+)
+FIELDS = ROWS * COLUMNS + 1
+
+
+def passthrough_middleware(next, root, info, **args):
+    return next(root, info, **args)
+
+
+def run(middleware):
+    result = graphql(Schema, QUERY, middleware=middleware)
+    assert not result.errors, result.errors
+
+
+def measure(middleware, number=20, repeat=5):
+    return min(timeit.repeat(lambda: run(middleware), number=number, repeat=repeat))
+
+
+def main():
+    number = 20
+    baseline = measure(None, number)
+    plain = measure([passthrough_middleware], number)
+    compiled = measure(compile_middleware([passthrough_middleware]), number)
+
+    def per_field(seconds):
+        return (seconds - baseline) / number / FIELDS * 1e9
+
+    print("fields per query:        %d" % FIELDS)
+    print("no middleware:           %.2f ms/query" % (baseline / number * 1e3))
+    print(
+        "MiddlewareManager:       %.2f ms/query (+%.0f ns/field)"
+        % (plain / number * 1e3, per_field(plain))
+    )
+    print(
+        "CompiledMiddleware:      %.2f ms/query (+%.0f ns/field)"
+        % (compiled / number * 1e3, per_field(compiled))
+    )
+    print("saved per field:         %.0f ns" % (per_field(plain) - per_field(compiled)))
+
+
+if __name__ == "__main__":
+    main()
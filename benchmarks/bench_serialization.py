@@ -0,0 +1,88 @@
+"""Completing and encoding a wide list query.
+
+Compares graphql-core execution followed by ``json_encode`` with the compiled
+serializers used by ``fast_serialization``.
+
+Run with ``python -m benchmarks.bench_serialization``.
+"""
+import json
+import timeit
+
+from graphql.execution import execute
+from graphql.language.parser import parse
+from graphql.type.definition import (
+    GraphQLField,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLObjectType,
+)
+from graphql.type.scalars import GraphQLBoolean, GraphQLFloat, GraphQLInt, GraphQLString
+from graphql.type.schema import GraphQLSchema
+from graphql_server import json_encode
+
+from quart_graphql.serializer import get_serialization_plan
+
+ROWS = 1000
+
+Row = GraphQLObjectType(
+    name="Row",
+    fields={
+        "id": GraphQLField(GraphQLNonNull(GraphQLInt)),
+        "name": GraphQLField(GraphQLString),
+        "email": GraphQLField(GraphQLString),
+        "score": GraphQLField(GraphQLFloat),
+        "active": GraphQLField(GraphQLBoolean),
+        "tags": GraphQLField(GraphQLList(GraphQLString)),
+    },
+)
+
+DATA = [
+    {
+        "id": row,
+        "name": "name %d" % row,
+        "email": "user%d@example.com" % row,
+        "score": row / 3,
+        "active": row % 2 == 0,
+        "tags": ["a", "b", "c"],
+    }
+    for row in range(ROWS)
+]
+
+Schema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={"rows": GraphQLField(GraphQLList(Row), resolver=lambda *_: DATA)},
+    )
+)
+
+QUERY = "{ rows { id name email score active tags } }"
+DOCUMENT = parse(QUERY)
+PLAN = get_serialization_plan(Schema, DOCUMENT)
+
+
+def run_graphql_core():
+    result = execute(Schema, DOCUMENT)
+    return json_encode({"data": result.data})
+
+
+def run_serializer():
+    return '{"data":' + PLAN.execute() + "}"
+
+
+def measure(func, number=20, repeat=5):
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main():
+    assert json.loads(run_graphql_core()) == json.loads(run_serializer())
+
+    baseline = measure(run_graphql_core)
+    serialized = measure(run_serializer)
+    print("rows per query:          %d" % ROWS)
+    print("execute + json_encode:   %.2f ms/query" % (baseline * 1e3))
+    print("compiled serializers:    %.2f ms/query" % (serialized * 1e3))
+    print("speedup:                 %.1fx" % (baseline / serialized))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""Load test of the view against a generated schema.
+
+The schema has ``depth`` levels of objects with ``width`` string fields each,
+linked by ``children`` lists of ``list_size`` items whose resolvers wait
+``latency`` seconds, like a database or service call. It is mounted with
+``tests.app.create_app`` and driven through the ASGI interface in process by
+``concurrency`` clients, so executor, caching and batching modes can be
+compared without a server or network in the way, e.g.
+
+    python -m benchmarks.load --mode async --latency 0.002 --concurrency 50
+    python -m benchmarks.load --mode sync --latency 0.002 --concurrency 50
+    python -m benchmarks.load --mode async --cache --batch 4
+
+``async`` resolvers sleep on the event loop (``enable_async``), ``sync``
+resolvers block it with ``time.sleep``.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import resource
+import sys
+import time
+from urllib.parse import urlencode
+
+from graphql.type.definition import GraphQLField, GraphQLList, GraphQLObjectType
+from graphql.type.scalars import GraphQLString
+from graphql.type.schema import GraphQLSchema
+
+from quart_graphql.cache import MemoryCache
+from tests.app import create_app
+
+
+def create_resolver(list_size, latency, mode):
+    def create_children(obj):
+        depth = obj.get("depth", 0) + 1 if isinstance(obj, dict) else 1
+        return [{"depth": depth, "index": index} for index in range(list_size)]
+
+    if mode == "async":
+
+        async def resolve_children(obj, info):
+            if latency:
+                await asyncio.sleep(latency)
+            return create_children(obj)
+
+    else:
+
+        def resolve_children(obj, info):
+            if latency:
+                time.sleep(latency)
+            return create_children(obj)
+
+    return resolve_children
+
+
+def generate_schema(depth=3, width=4, list_size=5, latency=0.0, mode="async"):
+    resolve_children = create_resolver(list_size, latency, mode)
+
+    def resolve_field(obj, info):
+        return "{}.{}".format(info.field_name, obj["index"])
+
+    object_type = None
+    for level in reversed(range(depth)):
+        fields = {
+            "field%d" % column: GraphQLField(GraphQLString, resolver=resolve_field)
+            for column in range(width)
+        }
+        if object_type is not None:
+            fields["children"] = GraphQLField(
+                GraphQLList(object_type), resolver=resolve_children
+            )
+        object_type = GraphQLObjectType(name="Level%d" % level, fields=fields)
+
+    return GraphQLSchema(
+        GraphQLObjectType(
+            name="Query",
+            fields={
+                "children": GraphQLField(
+                    GraphQLList(object_type), resolver=resolve_children
+                )
+            },
+        )
+    )
+
+
+def generate_query(depth=3, width=4):
+    selection = ""
+    for level in range(depth):
+        fields = " ".join("field%d" % column for column in range(width))
+        selection = "{ %s%s }" % (fields, " children " + selection if selection else "")
+    return "query Load { children %s }" % selection
+
+
+async def asgi_request(app, method, path, query_string=b"", body=b"", headers=()):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "query_string": query_string,
+        "root_path": "",
+        "headers": [(b"host", b"localhost")] + list(headers),
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    disconnect = asyncio.Event()
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    response = {"status": None, "body": []}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        disconnect.set()
+    return response["status"], b"".join(response["body"])
+
+
+def create_request(query, method="GET", batch=0):
+    # Returns the arguments of asgi_request for one operation, or a batch of
+    # them in a single POST.
+    if batch:
+        body = json.dumps([{"query": query}] * batch).encode("utf8")
+        headers = [(b"content-type", b"application/json")]
+        return "POST", "/graphql", b"", body, headers
+    if method == "GET":
+        return "GET", "/graphql", urlencode({"query": query}).encode("ascii"), b"", ()
+    body = json.dumps({"query": query}).encode("utf8")
+    return "POST", "/graphql", b"", body, [(b"content-type", b"application/json")]
+
+
+def get_percentile(values, percentile):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(percentile / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def get_max_rss():
+    # Peak resident set size of the process in MB (KB on Linux, bytes on macOS).
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0
+
+
+async def monitor_loop_lag(samples, stopped, interval=0.01):
+    loop = asyncio.get_event_loop()
+    while not stopped.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - expected))
+
+
+async def run_load(app, request, concurrency=10, requests=1000):
+    latencies = []
+    errors = []
+    remaining = [requests]
+
+    async def client():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            started = time.perf_counter()
+            status, body = await asgi_request(app, *request)
+            latencies.append(time.perf_counter() - started)
+            if status != 200 or b'"errors"' in body:
+                errors.append((status, body[:200]))
+
+    lag = []
+    stopped = asyncio.Event()
+    monitor = asyncio.ensure_future(monitor_loop_lag(lag, stopped))
+    started = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    stopped.set()
+    await monitor
+
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "elapsed": elapsed,
+        "throughput": len(latencies) / elapsed,
+        "latency": {
+            "p50": get_percentile(latencies, 50),
+            "p90": get_percentile(latencies, 90),
+            "p99": get_percentile(latencies, 99),
+            "max": max(latencies) if latencies else 0.0,
+        },
+        "loop_lag": {
+            "mean": sum(lag) / len(lag) if lag else 0.0,
+            "p99": get_percentile(lag, 99),
+            "max": max(lag) if lag else 0.0,
+        },
+    }
+
+
+def get_view_options(args):
+    options = {"batch": bool(args.batch)}
+    if args.mode == "async":
+        options["enable_async"] = True
+    if args.cache:
+        options["document_cache"] = MemoryCache()
+        options["cache_variables"] = True
+    if args.fast_serialization:
+        options["fast_serialization"] = True
+        options["compile_middleware"] = True
+    if args.deduplicate:
+        options["deduplicate"] = True
+    return options
+
+
+def print_report(args, report, rss_before, rss_after):
+    latency = report["latency"]
+    lag = report["loop_lag"]
+    print("mode:                    %s" % args.mode)
+    print(
+        "schema:                  depth %d, width %d, lists of %d, latency %.1f ms"
+        % (args.depth, args.width, args.list_size, args.latency * 1e3)
+    )
+    print(
+        "load:                    %d requests, %d clients%s"
+        % (
+            report["requests"],
+            args.concurrency,
+            ", batches of %d" % args.batch if args.batch else "",
+        )
+    )
+    print("throughput:              %.1f requests/s" % report["throughput"])
+    print(
+        "latency:                 p50 %.2f ms, p90 %.2f ms, p99 %.2f ms, max %.2f ms"
+        % tuple(latency[key] * 1e3 for key in ("p50", "p90", "p99", "max"))
+    )
+    print(
+        "event loop lag:          mean %.2f ms, p99 %.2f ms, max %.2f ms"
+        % tuple(lag[key] * 1e3 for key in ("mean", "p99", "max"))
+    )
+    print(
+        "peak RSS:                %.1f MB (%+.1f MB during the run)"
+        % (rss_after, rss_after - rss_before)
+    )
+    print("errors:                  %d" % report["errors"])
+    if report["first_error"] is not None:
+        print("first error:             %r" % (report["first_error"],))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--width", type=int, default=4)
+    parser.add_argument("--list-size", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.001, help="seconds")
+    parser.add_argument("--mode", choices=("async", "sync"), default="async")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--method", choices=("GET", "POST"), default="GET")
+    parser.add_argument("--batch", type=int, default=0, help="operations per POST")
+    parser.add_argument("--cache", action="store_true", help="document and variables")
+    parser.add_argument("--fast-serialization", action="store_true")
+    parser.add_argument("--deduplicate", action="store_true")
+    parser.add_argument("--warmup", type=int, default=20)
+    return parser.parse_args(argv)
+
+
+async def run(args):
+    schema = generate_schema(
+        args.depth, args.width, args.list_size, args.latency, args.mode
+    )
+    app = create_app(schema=schema, **get_view_options(args))
+    request = create_request(
+        generate_query(args.depth, args.width), args.method, args.batch
+    )
+
+    status, body = await asgi_request(app, *request)
+    if status != 200:
+        raise SystemExit("Request failed with %d: %s" % (status, body[:500]))
+    await run_load(app, request, min(args.concurrency, args.warmup), args.warmup)
+
+    gc.collect()
+    rss_before = get_max_rss()
+    report = await run_load(app, request, args.concurrency, args.requests)
+    print_report(args, report, rss_before, get_max_rss())
+    return report
+
+
+def main(argv=None):
+    return asyncio.run(run(parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,26 @@
-from .blueprint import GraphQL
-from .graphqlview import AsyncGraphQLView
+from importlib import import_module
 
-__all__ = ["GraphQL", "AsyncGraphQLView"]
+from .context import RequestContext
+
+__all__ = ["GraphQL", "AsyncGraphQLView", "RequestContext"]
+
+# The view pulls in Quart, graphql-core and graphql-server, and the deprecated
+# blueprint a Blueprint on top: load them on first access, so that importing
+# the package or one of its standalone modules (cache, assets) stays cheap.
+_LAZY_ATTRIBUTES = {
+    "AsyncGraphQLView": ".graphqlview",
+    "GraphQL": ".blueprint",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
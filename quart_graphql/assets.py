@@ -0,0 +1,119 @@
+import gzip
+import os
+import sys
+from collections import OrderedDict, namedtuple
+from hashlib import sha256
+
+GRAPHIQL_VERSION = "0.11.11"
+
+STATIC_DIRECTORY = os.path.join(os.path.dirname(__file__), "static", "graphiql")
+
+# Files GraphiQL needs, in the order the page loads them, with the CDN
+# location each one is fetched from when it isn't available locally.
+GRAPHIQL_ASSETS = OrderedDict(
+    [
+        ("graphiql.css", "//cdn.jsdelivr.net/npm/graphiql@{version}/graphiql.css"),
+        ("fetch.min.js", "//cdn.jsdelivr.net/fetch/0.9.0/fetch.min.js"),
+        ("react.min.js", "//cdn.jsdelivr.net/react/15.0.0/react.min.js"),
+        ("react-dom.min.js", "//cdn.jsdelivr.net/react/15.0.0/react-dom.min.js"),
+        (
+            "graphiql.min.js",
+            "//cdn.jsdelivr.net/npm/graphiql@{version}/graphiql.min.js",
+        ),
+    ]
+)
+
+CONTENT_TYPES = {
+    ".css": "text/css; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+}
+
+PRELOAD_TYPES = {".css": "style", ".js": "script"}
+
+Asset = namedtuple("Asset", "name content_type body gzip_body etag")
+
+
+def get_cdn_urls(version=GRAPHIQL_VERSION):
+    return OrderedDict(
+        (name, url.format(version=version)) for name, url in GRAPHIQL_ASSETS.items()
+    )
+
+
+def get_preload_type(name):
+    return PRELOAD_TYPES.get(os.path.splitext(name)[1], "fetch")
+
+
+class AssetStore(object):
+    # GraphiQL files vendored under static/graphiql/<version>/, each next to
+    # a .gz copy compressed ahead of time. Files are read once on first use.
+
+    def __init__(self, version=GRAPHIQL_VERSION, directory=None):
+        self.version = version
+        self.directory = os.path.join(directory or STATIC_DIRECTORY, version)
+        self._assets = {}
+        self._available = None
+
+    def is_available(self):
+        if self._available is None:
+            self._available = all(
+                os.path.isfile(os.path.join(self.directory, name))
+                for name in GRAPHIQL_ASSETS
+            )
+        return self._available
+
+    def get(self, name):
+        if name not in GRAPHIQL_ASSETS:
+            return None
+        try:
+            return self._assets[name]
+        except KeyError:
+            pass
+
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+        try:
+            with open(path + ".gz", "rb") as f:
+                gzip_body = f.read()
+        except OSError:
+            gzip_body = gzip.compress(body, 9)
+
+        asset = Asset(
+            name,
+            CONTENT_TYPES.get(os.path.splitext(name)[1], "application/octet-stream"),
+            body,
+            gzip_body,
+            sha256(body).hexdigest()[:16],
+        )
+        self._assets[name] = asset
+        return asset
+
+
+def vendor_assets(version=GRAPHIQL_VERSION, directory=None, fetch=None):
+    # Downloads the GraphiQL files from the CDN into the package, run it
+    # before building a release with `python -m quart_graphql.assets`.
+    from urllib.request import urlopen
+
+    fetch = fetch or (lambda url: urlopen(url).read())
+    directory = os.path.join(directory or STATIC_DIRECTORY, version)
+    os.makedirs(directory, exist_ok=True)
+
+    paths = []
+    for name, url in get_cdn_urls(version).items():
+        body = fetch("https:" + url)
+        path = os.path.join(directory, name)
+        with open(path, "wb") as f:
+            f.write(body)
+        # mtime=0 keeps the compressed files reproducible.
+        with open(path + ".gz", "wb") as f:
+            f.write(gzip.compress(body, 9, mtime=0))
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    for path in vendor_assets(*sys.argv[1:2]):
+        print(path)
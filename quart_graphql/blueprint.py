@@ -6,7 +6,7 @@ from .graphqlview import AsyncGraphQLView
 
 
 class GraphQL(object):
-    def __init__(self, app, schema, **options):
+    def __init__(self, app, schema, path="/graphql", **options):
         self.app = app
         warnings.warn(
             "GraphQL Blueprint is now deprecated, please use GraphQLView directly"
@@ -14,7 +14,7 @@ class GraphQL(object):
         self.blueprint = Blueprint("graphql", __name__, template_folder="templates")
 
         app.add_url_rule(
-            "/graphql",
+            path,
             view_func=AsyncGraphQLView.as_view("graphql", schema=schema, **options),
         )
 
@@ -0,0 +1,321 @@
+import io
+import os
+import pickle
+import stat
+import tempfile
+import time
+from collections import OrderedDict
+from hashlib import sha1, sha256
+
+# Default of PartitionedLRU.get for callers caching None.
+MISSING = object()
+
+# Classes a shared cache entry may contain besides builtin values: documents
+# parsed by graphql-core.
+SAFE_MODULES = frozenset(["graphql.language.ast"])
+SAFE_CLASSES = frozenset(
+    [("graphql.language.parser", "Loc"), ("graphql.language.source", "Source")]
+)
+
+
+class SafeUnpickler(pickle.Unpickler):
+    # Entries come from storage other processes can write to, refuse
+    # anything but plain data and document ASTs so they can't run code.
+
+    def find_class(self, module, name):
+        if module in SAFE_MODULES or (module, name) in SAFE_CLASSES:
+            cls = super(SafeUnpickler, self).find_class(module, name)
+            if isinstance(cls, type) and cls.__module__ == module:
+                return cls
+        raise pickle.UnpicklingError(
+            "Refusing to load {}.{} from the cache.".format(module, name)
+        )
+
+
+def loads(data):
+    return SafeUnpickler(io.BytesIO(data)).load()
+
+
+def dumps(value):
+    return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def get_document_cache_key(schema_hash, query):
+    return "document:{}:{}".format(
+        schema_hash, sha256(query.encode("utf8")).hexdigest()
+    )
+
+
+class CacheBackend(object):
+    async def get(self, key):
+        raise NotImplementedError(
+            "get method not implemented in {}.".format(self.__class__)
+        )
+
+    async def set(self, key, value, ttl=None):
+        raise NotImplementedError(
+            "set method not implemented in {}.".format(self.__class__)
+        )
+
+    async def delete(self, key):
+        raise NotImplementedError(
+            "delete method not implemented in {}.".format(self.__class__)
+        )
+
+
+class MemoryCache(CacheBackend):
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def get(self, key):
+        try:
+            value, expires = self._entries[key]
+        except KeyError:
+            return None
+        if expires is not None and expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key, value, ttl=None):
+        expires = time.monotonic() + ttl if ttl else None
+        self._entries[key] = (value, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key):
+        self._entries.pop(key, None)
+
+    async def clear(self):
+        self._entries.clear()
+
+
+def get_default_cache_directory():
+    # /dev/shm is memory backed on Linux, fall back to the temp directory.
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "quart-graphql-{}".format(os.getuid()))
+
+
+def check_cache_directory(directory):
+    # The default path is predictable, another user could have created it
+    # (or a symlink) first to plant entries.
+    st = os.lstat(directory)
+    if (
+        not stat.S_ISDIR(st.st_mode)
+        or st.st_uid != os.getuid()
+        or st.st_mode & (stat.S_IRWXG | stat.S_IRWXO)
+    ):
+        raise ValueError(
+            "Cache directory {!r} must be a directory owned by the current user "
+            "and private to it (mode 0700).".format(directory)
+        )
+
+
+class FileCache(CacheBackend):
+    # Entries are pickled into one file per key and replaced atomically, so
+    # every worker process on the host shares them. The operations are plain
+    # blocking calls, which is fine on a memory backed file system.
+
+    def __init__(self, directory=None, max_entries=4096):
+        self.directory = directory or get_default_cache_directory()
+        self.max_entries = max_entries
+        self._writes = 0
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        check_cache_directory(self.directory)
+
+    def get_path(self, key):
+        return os.path.join(self.directory, sha1(key.encode("utf8")).hexdigest())
+
+    async def get(self, key):
+        path = self.get_path(key)
+        try:
+            with open(path, "rb") as f:
+                stored_key, expires, value = loads(f.read())
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if stored_key != key:
+            return None
+        if expires is not None and expires < time.time():
+            await self.delete(key)
+            return None
+        return value
+
+    async def set(self, key, value, ttl=None):
+        expires = time.time() + ttl if ttl else None
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(dumps((key, expires, value)))
+            os.replace(temp_path, self.get_path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        self._writes += 1
+        if self._writes % 64 == 0:
+            self.prune()
+
+    async def delete(self, key):
+        try:
+            os.unlink(self.get_path(key))
+        except FileNotFoundError:
+            pass
+
+    async def clear(self):
+        for entry in os.scandir(self.directory):
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def prune(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(".tmp-"):
+                continue
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                pass
+
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, path in entries[: len(entries) - self.max_entries]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+
+class KeyValueCache(CacheBackend):
+    # Adapts a remote key-value client with awaitable get(key),
+    # set(key, value, ex=seconds) and delete(key) methods, such as aioredis.
+
+    def __init__(self, client, prefix="quart-graphql:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key):
+        value = await self.client.get(self.prefix + key)
+        if value is None:
+            return None
+        try:
+            return loads(value)
+        except (EOFError, pickle.UnpicklingError):
+            return None
+
+    async def set(self, key, value, ttl=None):
+        await self.client.set(
+            self.prefix + key,
+            dumps(value),
+            ex=int(ttl) if ttl else None,
+        )
+
+    async def delete(self, key):
+        await self.client.delete(self.prefix + key)
+
+
+class LocalKeyValueStore(object):
+    # In process stand-in for a remote key-value store, used for development
+    # and tests in place of a real client.
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        try:
+            value, expires = self.data[key]
+        except KeyError:
+            return None
+        if expires is not None and expires < time.time():
+            del self.data[key]
+            return None
+        return value
+
+    async def set(self, key, value, ex=None):
+        if not isinstance(value, bytes):
+            raise TypeError("Values must be bytes, got {!r}.".format(type(value)))
+        self.data[key] = (value, time.time() + ex if ex else None)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class PartitionedLRU(object):
+    # An in-process LRU bounded as a whole but kept per partition, e.g. per
+    # schema. When it is full the least recently used entry of the largest
+    # partition is evicted, so one busy partition can't push out the others,
+    # and a single partition can be invalidated on its own.
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._partitions = {}
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def get(self, partition, key, default=None):
+        entries = self._partitions.get(partition)
+        if entries is None:
+            return default
+        try:
+            value = entries[key]
+        except KeyError:
+            return default
+        entries.move_to_end(key)
+        return value
+
+    def set(self, partition, key, value):
+        entries = self._partitions.get(partition)
+        if entries is None:
+            entries = self._partitions[partition] = OrderedDict()
+        if key in entries:
+            entries.move_to_end(key)
+        else:
+            self._size += 1
+        entries[key] = value
+        while self._size > self.max_entries:
+            self.evict()
+
+    def pop(self, partition, key, default=None):
+        entries = self._partitions.get(partition)
+        if entries is None or key not in entries:
+            return default
+        self._size -= 1
+        value = entries.pop(key)
+        if not entries:
+            del self._partitions[partition]
+        return value
+
+    def evict(self):
+        partition, entries = max(
+            self._partitions.items(), key=lambda item: len(item[1])
+        )
+        entries.popitem(last=False)
+        self._size -= 1
+        if not entries:
+            del self._partitions[partition]
+
+    def get_partition_size(self, partition):
+        return len(self._partitions.get(partition, ()))
+
+    def keys(self, partition):
+        return list(self._partitions.get(partition, ()))
+
+    def invalidate(self, partition):
+        entries = self._partitions.pop(partition, None)
+        if entries:
+            self._size -= len(entries)
+
+    def clear(self):
+        self._partitions.clear()
+        self._size = 0
@@ -0,0 +1,69 @@
+import logging
+from inspect import isawaitable
+
+logger = logging.getLogger(__name__)
+
+
+class RequestContext(object):
+    __slots__ = (
+        "request",
+        "user",
+        "loaders",
+        "cache",
+        "timings",
+        "extensions",
+        "params",
+        "document",
+        "signature",
+        "result",
+        "usage",
+        "_cleanup",
+    )
+
+    def __init__(self, request, user=None):
+        self.request = request
+        self.user = user
+        self.loaders = {}
+        self.cache = {}
+        self.timings = {}
+        self.extensions = {}
+        self.params = None
+        self.document = None
+        self.signature = None
+        self.result = None
+        self.usage = None
+        self._cleanup = []
+
+    # The Quart request used to be the context itself, keep resolvers written
+    # against it (``info.context.args``, ``info.context.headers``) working.
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.request, name)
+
+    @property
+    def args(self):
+        return self.request.args
+
+    @property
+    def headers(self):
+        return self.request.headers
+
+    @property
+    def method(self):
+        return self.request.method
+
+    def add_cleanup(self, callback):
+        self._cleanup.append(callback)
+
+    async def close(self):
+        # Runs once the response is built, a failing callback must not turn
+        # it into an error or keep the others from running.
+        while self._cleanup:
+            callback = self._cleanup.pop()
+            try:
+                result = callback()
+                if isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Request context cleanup failed.")
@@ -0,0 +1,101 @@
+import random
+from collections import OrderedDict
+from traceback import format_tb
+
+from graphql_server import default_format_error
+from promise import is_thenable
+
+
+def get_error_traceback(error):
+    stack = getattr(error, "stack", None) or error.__traceback__
+    original_error = getattr(error, "original_error", None)
+    if stack is None and original_error is not None:
+        stack = getattr(original_error, "stack", None) or original_error.__traceback__
+    return format_tb(stack) if stack is not None else None
+
+
+class ErrorPipeline(object):
+    def __init__(
+        self,
+        format_error=default_format_error,
+        max_errors=20,
+        max_paths=20,
+        deduplicate=True,
+        traceback_sample_rate=0.0,
+        sample=random.random,
+    ):
+        self.format_error = format_error
+        self.max_errors = max_errors
+        self.max_paths = max_paths
+        self.deduplicate = deduplicate
+        self.traceback_sample_rate = traceback_sample_rate
+        self.sample = sample
+
+    def should_capture_traceback(self):
+        return (
+            self.traceback_sample_rate > 0
+            and self.sample() < self.traceback_sample_rate
+        )
+
+    def is_sampled(self, error):
+        original_error = getattr(error, "original_error", None) or error
+        sampled = getattr(original_error, "traceback_sampled", None)
+        if sampled is None:
+            return self.should_capture_traceback()
+        return sampled
+
+    # Used as graphql middleware: failing resolvers return their exception
+    # instead of raising it, which skips graphql-core logging the full stack,
+    # and the traceback is only kept for sampled errors.
+    def resolve(self, next, root, info, **args):
+        try:
+            result = next(root, info, **args)
+        except Exception as e:
+            return self.capture_error(e)
+        if is_thenable(result):
+            return result.catch(self.capture_error)
+        return result
+
+    def capture_error(self, error):
+        error.traceback_sampled = self.should_capture_traceback()
+        if not error.traceback_sampled:
+            error.__traceback__ = None
+            error.stack = None
+        return error
+
+    def format_errors(self, errors):
+        formatted_errors = OrderedDict()
+        omitted = 0
+        for error in errors:
+            key = str(error) if self.deduplicate else len(formatted_errors)
+            group = formatted_errors.get(key)
+            if group is not None:
+                group[1].append(getattr(error, "path", None))
+                continue
+            if self.max_errors is not None and len(formatted_errors) >= self.max_errors:
+                omitted += 1
+                continue
+            formatted_errors[key] = (error, [getattr(error, "path", None)])
+
+        results = []
+        for error, paths in formatted_errors.values():
+            formatted_error = self.format_error(error)
+            extensions = None
+            if len(paths) > 1:
+                extensions = dict(formatted_error.get("extensions") or {})
+                extensions["count"] = len(paths)
+                extensions["paths"] = [path for path in paths if path][: self.max_paths]
+            if self.traceback_sample_rate and self.is_sampled(error):
+                traceback = get_error_traceback(error)
+                if traceback:
+                    extensions = dict(
+                        extensions or formatted_error.get("extensions") or {}
+                    )
+                    extensions["traceback"] = traceback
+            if extensions is not None:
+                formatted_error["extensions"] = extensions
+            results.append(formatted_error)
+
+        if omitted:
+            results.append({"message": "{} more errors were omitted.".format(omitted)})
+        return results
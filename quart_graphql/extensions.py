@@ -0,0 +1,57 @@
+class Extension(object):
+    async def on_request_start(self, context):
+        pass
+
+    async def on_request_end(self, context):
+        pass
+
+    async def on_parse_start(self, context):
+        pass
+
+    async def on_parse_end(self, context):
+        pass
+
+    async def on_validate_start(self, context):
+        pass
+
+    async def on_validate_end(self, context):
+        pass
+
+    async def on_execute_start(self, context):
+        pass
+
+    async def on_execute_end(self, context):
+        pass
+
+    async def on_encode_start(self, context):
+        pass
+
+    async def on_encode_end(self, context):
+        pass
+
+    def get_results(self, context):
+        return None
+
+
+class ExtensionsRunner(object):
+    def __init__(self, extensions, context):
+        self.extensions = extensions
+        self.context = context
+
+    async def start(self, phase):
+        hook = "on_%s_start" % phase
+        for extension in self.extensions:
+            await getattr(extension, hook)(self.context)
+
+    async def end(self, phase):
+        hook = "on_%s_end" % phase
+        for extension in reversed(self.extensions):
+            await getattr(extension, hook)(self.context)
+
+    def get_results(self):
+        results = {}
+        for extension in self.extensions:
+            extension_results = extension.get_results(self.context)
+            if extension_results:
+                results.update(extension_results)
+        return results
@@ -1,17 +1,49 @@
+import asyncio
+import json
+from collections import OrderedDict
+from collections.abc import Mapping
 from functools import partial
+from hashlib import sha256
 
+from graphql import get_default_backend
+from graphql.backend.base import GraphQLDocument
+from graphql.backend.core import execute_and_validate
+from graphql.error import GraphQLSyntaxError
+from graphql.execution import ExecutionResult
+from graphql.execution.executors.asyncio import AsyncioExecutor
+from graphql.language.parser import parse
 from graphql.type.schema import GraphQLSchema
-from graphql_server import (HttpQueryError, default_format_error,
-                            encode_execution_results, json_encode,
-                            load_json_body, run_http_query)
-from quart import Response, request
+from graphql.validation import validate
+from graphql_server import (
+    HttpQueryError,
+    RequestParams,
+    ServerResponse,
+    default_format_error,
+    format_execution_result,
+    get_graphql_params,
+    json_encode,
+    load_json_body,
+)
+from promise import is_thenable
+from quart import Response, make_push_promise, request, url_for
 from quart.views import View
 
-from .render_graphiql import render_graphiql
+from .assets import GRAPHIQL_ASSETS, GRAPHIQL_VERSION, AssetStore, get_preload_type
+from .cache import get_document_cache_key
+from .context import RequestContext
+from .extensions import ExtensionsRunner
+from .introspection import IntrospectionCache
+from .limits import limit_middleware
+from .middleware import CompiledMiddleware, compile_middleware
+from .serializer import Fallback, JSONData, SerializerCache, encode_result
+from .signature import SignatureCache, get_schema_hash
+from .singleflight import SingleFlight
+from .variables import VariablesCache, execute_with_plan
 
 
 class AsyncGraphQLView(View):
     schema = None
+    schema_registry = None
     executor = None
     root_value = None
     pretty = False
@@ -20,8 +52,38 @@ class AsyncGraphQLView(View):
     graphiql_version = None
     graphiql_template = None
     graphiql_html_title = None
+    graphiql_assets = None
+    graphiql_push_assets = False
     middleware = None
+    compile_middleware = False
     batch = False
+    context_class = RequestContext
+    request_context = None
+    query_data = None
+    extensions = None
+    extensions_runner = None
+    enable_async = False
+    cache_introspection = False
+    introspection_cache = None
+    deduplicate = False
+    inflight = None
+    shared_execution = None
+    normalize_queries = False
+    signature_cache = None
+    document_cache = None
+    persisted_query_cache = None
+    response_cache = None
+    response_cache_ttl = None
+    error_pipeline = None
+    cache_variables = False
+    variables_cache = None
+    rate_limiter = None
+    rate_limit_charged = False
+    fast_serialization = False
+    serializer_cache = None
+    profiler = None
+    watchdog = None
+    result_limits = None
 
     methods = ["GET", "POST", "PUT", "DELETE"]
 
@@ -31,15 +93,67 @@ class AsyncGraphQLView(View):
             if hasattr(self, key):
                 setattr(self, key, value)
 
-        if not isinstance(self.schema, GraphQLSchema):
+        if self.schema_registry is None and not isinstance(self.schema, GraphQLSchema):
             raise ValueError("A Schema is required to be provided to AsyncGraphQLView.")
 
+        if self.compile_middleware:
+            self.middleware = compile_middleware(self.middleware)
+        if self.result_limits is not None:
+            self.middleware = limit_middleware(self.middleware)
+        if self.introspection_cache is None:
+            self.introspection_cache = IntrospectionCache()
+        if self.inflight is None:
+            self.inflight = SingleFlight()
+        if self.signature_cache is None:
+            self.signature_cache = SignatureCache()
+        if self.variables_cache is None:
+            self.variables_cache = VariablesCache()
+        if self.serializer_cache is None:
+            self.serializer_cache = SerializerCache()
+        if self.graphiql and self.graphiql_assets is None:
+            self.graphiql_assets = AssetStore(self.graphiql_version or GRAPHIQL_VERSION)
+
+    @classmethod
+    def as_view(cls, name, *class_args, **class_kwargs):
+        # Views are instantiated per request, shared state has to be created
+        # once here so every instance of this route sees the same object.
+        class_kwargs.setdefault("introspection_cache", IntrospectionCache())
+        class_kwargs.setdefault("inflight", SingleFlight())
+        class_kwargs.setdefault("signature_cache", SignatureCache())
+        class_kwargs.setdefault("variables_cache", VariablesCache())
+        class_kwargs.setdefault("serializer_cache", SerializerCache())
+        schema_registry = class_kwargs.get("schema_registry", cls.schema_registry)
+        if schema_registry is not None:
+            for key in ("introspection_cache", "variables_cache", "serializer_cache"):
+                schema_registry.add_cache(class_kwargs[key])
+            document_cache = class_kwargs.get("document_cache", cls.document_cache)
+            if document_cache is not None:
+                schema_registry.add_document_cache(document_cache)
+        if class_kwargs.get("graphiql", cls.graphiql):
+            class_kwargs.setdefault(
+                "graphiql_assets",
+                AssetStore(
+                    class_kwargs.get("graphiql_version")
+                    or cls.graphiql_version
+                    or GRAPHIQL_VERSION
+                ),
+            )
+        if class_kwargs.get("compile_middleware", cls.compile_middleware):
+            class_kwargs["middleware"] = compile_middleware(
+                class_kwargs.get("middleware", cls.middleware)
+            )
+        if class_kwargs.get("result_limits", cls.result_limits) is not None:
+            class_kwargs["middleware"] = limit_middleware(
+                class_kwargs.get("middleware", cls.middleware)
+            )
+        return super(AsyncGraphQLView, cls).as_view(name, *class_args, **class_kwargs)
+
     # noinspection PyUnusedLocal
     def get_root_value(self):
         return self.root_value
 
     def get_context(self):
-        return request
+        return self.request_context
 
     def get_middleware(self):
         return self.middleware
@@ -48,68 +162,708 @@ class AsyncGraphQLView(View):
         return self.backend
 
     def get_executor(self):
+        if self.executor is None and self.enable_async:
+            return AsyncioExecutor(loop=asyncio.get_event_loop())
         return self.executor
 
+    def get_cache_scope(self):
+        return None
+
     async def render_graphiql(self, params, result):
-        return await render_graphiql(
+        # The GraphiQL template is only needed by browsers, most workers never
+        # load it.
+        from .render_graphiql import render_graphiql
+
+        asset_urls = self.get_graphiql_asset_urls()
+        html = await render_graphiql(
             params=params,
             result=result,
             graphiql_version=self.graphiql_version,
             graphiql_template=self.graphiql_template,
             graphiql_html_title=self.graphiql_html_title,
+            asset_urls=asset_urls,
         )
+        if asset_urls is None:
+            return html
+
+        # Proxies and CDNs turn preload links into 103 Early Hints.
+        links = [
+            "<{}>; rel=preload; as={}".format(url, get_preload_type(name))
+            for name, url in asset_urls.items()
+        ]
+        if self.graphiql_push_assets:
+            for url in asset_urls.values():
+                await make_push_promise(url)
+        return Response(
+            html,
+            content_type="text/html; charset=utf-8",
+            headers={"Link": ", ".join(links)},
+        )
+
+    def get_graphiql_asset_urls(self):
+        # Without vendored assets GraphiQL is loaded from the CDN.
+        assets = self.graphiql_assets
+        if assets is None or not assets.is_available():
+            return None
+        return OrderedDict(
+            (
+                name,
+                url_for(
+                    request.endpoint,
+                    graphiql_asset="{}/{}".format(assets.version, name),
+                    **(request.view_args or {})
+                ),
+            )
+            for name in GRAPHIQL_ASSETS
+        )
+
+    def serve_graphiql_asset(self, path):
+        version, _, name = path.partition("/")
+        asset = None
+        if version == self.graphiql_assets.version:
+            asset = self.graphiql_assets.get(name)
+        if asset is None:
+            return Response("Not Found", status=404, content_type="text/plain")
+
+        # Asset URLs contain the version, so they never change.
+        headers = {
+            "Cache-Control": "public, max-age=31536000, immutable",
+            "ETag": '"{}"'.format(asset.etag),
+            "Vary": "Accept-Encoding",
+        }
+        if asset.etag in request.if_none_match:
+            return Response(b"", status=304, headers=headers)
+
+        body = asset.body
+        if "gzip" in request.accept_encodings:
+            body = asset.gzip_body
+            headers["Content-Encoding"] = "gzip"
+        return Response(body, content_type=asset.content_type, headers=headers)
 
     format_error = staticmethod(default_format_error)
     encode = staticmethod(json_encode)
 
-    async def dispatch_request(self):
+    async def dispatch_request(self, *args, **kwargs):
+        if (
+            self.graphiql_assets is not None
+            and request.method == "GET"
+            and "graphiql_asset" in request.args
+        ):
+            return self.serve_graphiql_asset(request.args["graphiql_asset"])
+
+        if self.schema_registry is not None:
+            self.schema = self.schema_registry.select(request)
+            if self.schema is None:
+                return self.get_error_response(
+                    HttpQueryError(404, "Unknown GraphQL schema.")
+                )
+
+        if self.watchdog is not None and not self.watchdog.is_running():
+            self.watchdog.start()
+
+        self.request_context = self.context_class(request._get_current_object())
+        if self.result_limits is not None:
+            self.request_context.usage = self.result_limits.start()
+        profile = None
+        if self.profiler is not None:
+            profile = self.profiler.start(self.request_context)
         try:
-            request_method = request.method.lower()
-            data = await self.parse_body()
+            if not self.extensions:
+                return await self.handle_request()
 
-            show_graphiql = request_method == "get" and self.should_display_graphiql()
+            self.extensions_runner = ExtensionsRunner(
+                self.extensions, self.request_context
+            )
+            await self.extensions_runner.start("request")
+            try:
+                return await self.handle_request()
+            finally:
+                await self.extensions_runner.end("request")
+        finally:
+            shared = self.shared_execution
+            if shared is not None and not shared.done():
+                # The coalesced execution this request started outlives it
+                # when it is cancelled, and still uses its context.
+                shared.add_done_callback(
+                    lambda task: asyncio.ensure_future(self.finish_request(profile))
+                )
+            else:
+                await self.finish_request(profile)
+
+    async def finish_request(self, profile=None):
+        if profile is not None:
+            await self.profiler.finish(profile, self.get_query_signature)
+        await self.request_context.close()
+
+    async def handle_request(self):
+        try:
+            request_method = request.method.lower()
+            data, args, show_graphiql = await self.read_request(request_method)
             catch = show_graphiql
 
-            pretty = self.pretty or show_graphiql or request.args.get("pretty")
+            pretty = bool(self.pretty or show_graphiql or args.get("pretty"))
 
-            extra_options = {}
-            executor = self.get_executor()
-            if executor:
-                extra_options["executor"] = executor
+            introspection_key = None
+            if (
+                self.cache_introspection
+                and not self.extensions
+                and not show_graphiql
+                and request_method in ("get", "post")
+            ):
+                introspection_key = self.get_introspection_key(data, pretty)
+                if introspection_key is not None:
+                    cached = self.introspection_cache.get(
+                        self.schema, introspection_key
+                    )
+                    if cached is not None:
+                        return Response(
+                            cached, status=200, content_type="application/json"
+                        )
 
-            execution_results, all_params = run_http_query(
-                self.schema,
-                request_method,
-                data,
-                query_data=request.args,
-                batch_enabled=self.batch,
-                catch=catch,
-                backend=self.get_backend(),
-                # Execute options
-                root=self.get_root_value(),
-                context=self.get_context(),
-                middleware=self.get_middleware(),
-                **extra_options
-            )
-            result, status_code = encode_execution_results(
-                execution_results,
-                is_batch=isinstance(data, list),
-                format_error=self.format_error,
-                encode=partial(self.encode, pretty=pretty),
+            if (
+                (self.should_deduplicate() or self.get_response_cache() is not None)
+                and request_method == "get"
+                and not show_graphiql
+            ):
+                response_key = self.get_response_key(data, pretty)
+                if response_key is not None:
+                    await self.charge_shared_request(data)
+                    result, status_code = await self.get_shared_response(
+                        request_method, data, pretty, response_key
+                    )
+                    return Response(
+                        result, status=status_code, content_type="application/json"
+                    )
+
+            execution_results, all_params = await self.execute(
+                request_method, data, catch
             )
+            if self.extensions_runner is None:
+                result, status_code = self.encode_results(
+                    execution_results, data, pretty
+                )
+            else:
+                await self.extensions_runner.start("encode")
+                try:
+                    result, status_code = self.encode_results(
+                        execution_results, data, pretty
+                    )
+                finally:
+                    await self.extensions_runner.end("encode")
 
             if show_graphiql:
                 return await self.render_graphiql(params=all_params[0], result=result)
 
+            if (
+                introspection_key is not None
+                and status_code == 200
+                and not execution_results[0].errors
+            ):
+                result = result.encode("utf8")
+                self.introspection_cache.set(self.schema, introspection_key, result)
+
             return Response(result, status=status_code, content_type="application/json")
 
         except HttpQueryError as e:
-            return Response(
-                self.encode({"errors": [self.format_error(e)]}),
-                status=e.status_code,
-                headers=e.headers,
-                content_type="application/json",
+            return self.get_error_response(e)
+
+    async def read_request(self, request_method):
+        if request_method == "get":
+            # GET requests carry everything in the query string, Quart has
+            # already decoded it and there is no body to wait for.
+            self.query_data = {}
+            return request.args, request.args, self.should_display_graphiql()
+        data = await self.parse_body()
+        self.query_data = request.args
+        return data, self.query_data, False
+
+    def get_error_response(self, error):
+        return Response(
+            self.encode({"errors": [self.format_error(error)]}),
+            status=error.status_code,
+            headers=error.headers,
+            content_type="application/json",
+        )
+
+    async def execute(self, request_method, data, catch=False):
+        # Mirrors graphql_server.run_http_query, split in phases so the view
+        # can await extension hooks and cache lookups in between.
+        if request_method not in ("get", "post"):
+            raise HttpQueryError(
+                405,
+                "GraphQL only supports GET and POST requests.",
+                headers={"Allow": "GET, POST"},
+            )
+
+        is_batch = isinstance(data, list)
+        if not is_batch:
+            if not isinstance(data, Mapping):
+                raise HttpQueryError(
+                    400, "GraphQL params should be a dict. Received {!r}.".format(data)
+                )
+            data = [data]
+        elif not self.batch:
+            raise HttpQueryError(400, "Batch GraphQL requests are not enabled.")
+
+        if not data:
+            raise HttpQueryError(400, "Received an empty list in the batch request.")
+
+        query_data = {} if is_batch else self.get_query_args()
+        all_params = [self.get_graphql_params(entry, query_data) for entry in data]
+        execute_options = self.get_execute_options()
+        runner = self.extensions_runner
+
+        execution_results = []
+        for entry, params in zip(data, all_params):
+            try:
+                if self.persisted_query_cache is not None:
+                    params = await self.load_persisted_query(entry, query_data, params)
+                execution_result = await self.execute_operation(
+                    params, request_method == "get", execute_options
+                )
+            except HttpQueryError:
+                if not catch:
+                    raise
+                execution_result = None
+
+            if execution_result is not None and runner is not None:
+                self.request_context.result = execution_result
+                extension_results = runner.get_results()
+                if extension_results:
+                    execution_result.extensions.update(extension_results)
+            execution_results.append(execution_result)
+
+        return execution_results, all_params
+
+    def get_query_args(self):
+        if self.query_data is None:
+            return request.args
+        return self.query_data
+
+    def get_graphql_params(self, data, query_data):
+        if not self.cache_variables:
+            return get_graphql_params(data, query_data)
+
+        query = data.get("query") or query_data.get("query")
+        variables = data.get("variables") or query_data.get("variables")
+        operation_name = data.get("operationName") or query_data.get("operationName")
+        return RequestParams(
+            query, self.variables_cache.load(variables), operation_name
+        )
+
+    def get_execute_options(self):
+        options = {
+            "root": self.get_root_value(),
+            "context": self.get_context(),
+            "middleware": self.get_middleware(),
+        }
+        executor = self.get_executor()
+        if executor:
+            options["executor"] = executor
+        if self.enable_async:
+            options["return_promise"] = True
+        return options
+
+    async def execute_operation(self, params, allow_only_query, execute_options):
+        context = self.request_context
+        runner = self.extensions_runner
+        context.params = params
+        context.document = None
+        context.signature = None
+        context.result = None
+
+        if not params.query:
+            raise HttpQueryError(400, "Must provide query string.")
+
+        charged = await self.charge_rate_limit(params)
+
+        if runner is not None:
+            await runner.start("parse")
+        try:
+            document, validated = await self.get_document(params.query)
+            context.document = document
+            if self.normalize_queries:
+                context.signature = self.signature_cache.get(
+                    params.query, params.operation_name, document.document_ast
+                )
+        except Exception as e:
+            return ExecutionResult(errors=[e], invalid=True)
+        finally:
+            if runner is not None:
+                await runner.end("parse")
+
+        if not charged:
+            await self.charge_rate_limit(params, document.document_ast)
+
+        if allow_only_query:
+            operation_type = document.get_operation_type(params.operation_name)
+            if operation_type and operation_type != "query":
+                raise HttpQueryError(
+                    405,
+                    "Can only perform a {} operation from a POST request.".format(
+                        operation_type
+                    ),
+                    headers={"Allow": "POST"},
+                )
+
+        if not validated:
+            if runner is not None:
+                await runner.start("validate")
+            try:
+                validation_errors = validate(self.schema, document.document_ast)
+            finally:
+                if runner is not None:
+                    await runner.end("validate")
+            if validation_errors:
+                return ExecutionResult(errors=validation_errors, invalid=True)
+            if self.document_cache is not None and self.get_backend() is None:
+                await self.document_cache.set(
+                    self.get_document_cache_key(params.query), document.document_ast
+                )
+
+        usage = context.usage
+        if usage is not None and usage.exceeded:
+            return ExecutionResult(errors=[usage.get_error()])
+
+        if runner is not None:
+            await runner.start("execute")
+        try:
+            execution_result = self.execute_document(document, params, execute_options)
+            if is_thenable(execution_result):
+                execution_result = await execution_result
+        except HttpQueryError:
+            raise
+        except Exception as e:
+            execution_result = ExecutionResult(errors=[e], invalid=True)
+        finally:
+            if runner is not None:
+                await runner.end("execute")
+
+        # The partial result of an operation that went over the limit is
+        # dropped, only the error is returned.
+        if usage is not None and usage.exceeded:
+            return ExecutionResult(errors=[usage.get_error()])
+        return execution_result
+
+    async def charge_rate_limit(self, params, document_ast=None):
+        # Costs are memoized by query text, so known queries are charged and
+        # rejected before they are even parsed.
+        if self.rate_limiter is None or self.rate_limit_charged:
+            return True
+
+        if document_ast is None:
+            cost = self.rate_limiter.get_cached_cost(
+                params.query, params.operation_name
+            )
+            if cost is None:
+                return False
+        else:
+            cost = self.rate_limiter.compute_cost(
+                params.query, params.operation_name, document_ast
+            )
+        await self.rate_limiter.consume(self.request_context, cost)
+        return True
+
+    async def charge_shared_request(self, data):
+        # Responses from the response cache or an identical in-flight request
+        # are shared, every request is charged before it gets one and the
+        # shared execution doesn't charge again.
+        if self.rate_limiter is None:
+            return
+        params = RequestParams(*self.get_request_params(data))
+        if not await self.charge_rate_limit(params):
+            try:
+                document_ast = parse(params.query)
+            except GraphQLSyntaxError:
+                # Reported by the execution, which charges nothing either.
+                document_ast = None
+            if document_ast is not None:
+                await self.charge_rate_limit(params, document_ast)
+        self.rate_limit_charged = True
+
+    def execute_document(self, document, params, execute_options):
+        if self.fast_serialization:
+            execution_result = self.execute_serialized(
+                document, params, execute_options
+            )
+            if execution_result is not None:
+                return execution_result
+
+        # Documents of the core backend can run from a coercion plan, which
+        # checks simple scalar variables once instead of graphql-core's
+        # generic coercion. Anything the plan can't vouch for falls back.
+        if self.cache_variables and self.get_backend() is None:
+            plan = self.variables_cache.get_plan(
+                self.schema,
+                params.query,
+                document.document_ast,
+                params.operation_name,
+            )
+            variables = plan.coerce(params.variables) if plan is not None else None
+            if variables is not None:
+                return execute_with_plan(
+                    self.schema,
+                    plan,
+                    variables,
+                    operation_name=params.operation_name,
+                    **execute_options
+                )
+
+        return document.execute(
+            operation_name=params.operation_name,
+            variables=params.variables,
+            validate=False,
+            **execute_options
+        )
+
+    def execute_serialized(self, document, params, execute_options):
+        # Synchronous queries of the core backend are completed and encoded in
+        # one pass. Whenever graphql-core has to report an error or a resolver
+        # returns a promise the plan gives up and the operation runs again
+        # through graphql-core, repeated fallbacks disable the plan for a while.
+        middleware = execute_options["middleware"]
+        if (
+            self.get_backend() is not None
+            or "executor" in execute_options
+            or (middleware and not isinstance(middleware, CompiledMiddleware))
+        ):
+            return None
+
+        plan = self.serializer_cache.get_plan(
+            self.schema,
+            params.query,
+            document.document_ast,
+            params.operation_name,
+            middleware,
+        )
+        if plan is None:
+            return None
+        usage = self.request_context.usage
+        if usage is not None:
+            measured = usage.nodes, usage.bytes
+        try:
+            data = plan.execute(
+                execute_options["root"], execute_options["context"], params.variables
+            )
+        except Fallback:
+            self.serializer_cache.record_fallback(
+                self.schema, params.query, params.operation_name, middleware
+            )
+            # graphql-core measures the operation again.
+            if usage is not None and not usage.exceeded:
+                usage.nodes, usage.bytes = measured
+            return None
+        self.serializer_cache.record_success(
+            self.schema, params.query, params.operation_name, middleware
+        )
+        return ExecutionResult(data=JSONData(data))
+
+    def get_query_signature(self):
+        context = self.request_context
+        if context.signature is not None:
+            return context.signature
+        if context.params is None or context.document is None:
+            return None
+        return self.signature_cache.get(
+            context.params.query,
+            context.params.operation_name,
+            context.document.document_ast,
+        )
+
+    def get_schema_id(self):
+        if self.schema_registry is not None:
+            return self.schema_registry.get_schema_hash(self.schema)
+        return get_schema_hash(self.schema)
+
+    def get_document_cache_key(self, query):
+        return get_document_cache_key(self.get_schema_id(), query)
+
+    async def get_document(self, query):
+        # Only documents that passed validation are cached, a hit skips both
+        # parsing and validation. Custom backends manage their own documents.
+        backend = self.get_backend()
+        if backend is not None or self.document_cache is None:
+            backend = backend or get_default_backend()
+            return backend.document_from_string(self.schema, query), False
+
+        document_ast = await self.document_cache.get(self.get_document_cache_key(query))
+        if document_ast is None:
+            return get_default_backend().document_from_string(self.schema, query), False
+
+        document = GraphQLDocument(
+            schema=self.schema,
+            document_string=query,
+            document_ast=document_ast,
+            execute=partial(execute_and_validate, self.schema, document_ast),
+        )
+        return document, True
+
+    async def load_persisted_query(self, entry, query_data, params):
+        extensions = entry.get("extensions") or query_data.get("extensions")
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpQueryError(400, "Extensions are invalid JSON.")
+        if not isinstance(extensions, Mapping):
+            return params
+
+        persisted_query = extensions.get("persistedQuery")
+        if not isinstance(persisted_query, Mapping):
+            return params
+
+        query_hash = persisted_query.get("sha256Hash")
+        if not isinstance(query_hash, str):
+            raise HttpQueryError(400, "Persisted query is missing sha256Hash.")
+        key = "apq:" + query_hash
+
+        if params.query:
+            if sha256(params.query.encode("utf8")).hexdigest() != query_hash:
+                raise HttpQueryError(400, "Provided sha256Hash does not match query.")
+            await self.persisted_query_cache.set(key, params.query)
+            return params
+
+        query = await self.persisted_query_cache.get(key)
+        if query is None:
+            # Apollo clients look for this message and retry with the query.
+            raise HttpQueryError(200, "PersistedQueryNotFound")
+        return params._replace(query=query)
+
+    def format_execution_result(self, execution_result):
+        if self.error_pipeline is None or execution_result is None:
+            result, status_code = format_execution_result(
+                execution_result, self.format_error
+            )
+        else:
+            status_code = 400 if execution_result.invalid else 200
+            result = OrderedDict()
+            if execution_result.errors:
+                result["errors"] = self.error_pipeline.format_errors(
+                    execution_result.errors
+                )
+            if not execution_result.invalid:
+                result["data"] = execution_result.data
+
+        if execution_result is not None and execution_result.extensions:
+            result["extensions"] = execution_result.extensions
+        return result, status_code
+
+    def encode_results(self, execution_results, data, pretty):
+        results, status_codes = zip(
+            *[
+                self.format_execution_result(execution_result)
+                for execution_result in execution_results
+            ]
+        )
+        result = results if isinstance(data, list) else results[0]
+        if self.fast_serialization:
+            encoded = encode_result(result, self.encode, pretty)
+        else:
+            encoded = self.encode(result, pretty=pretty)
+
+        usage = self.request_context.usage
+        if usage is not None and usage.add_encoded(len(encoded)):
+            result, _ = self.format_execution_result(
+                ExecutionResult(errors=[usage.get_error()])
             )
+            if isinstance(data, list):
+                result = [result] * len(results)
+            encoded = self.encode(result, pretty=pretty)
+        return ServerResponse(encoded, max(status_codes))
+
+    async def execute_and_encode(self, request_method, data, pretty, cache_key=None):
+        execution_results, _ = await self.execute(request_method, data)
+        result, status_code = self.encode_results(execution_results, data, pretty)
+        result = result.encode("utf8")
+        if (
+            cache_key is not None
+            and status_code == 200
+            and not execution_results[0].errors
+        ):
+            await self.response_cache.set(cache_key, result, self.response_cache_ttl)
+        return result, status_code
+
+    def get_request_params(self, data):
+        if not isinstance(data, Mapping):
+            return None
+
+        args = self.get_query_args()
+        query = data.get("query") or args.get("query")
+        variables = data.get("variables") or args.get("variables")
+        operation_name = data.get("operationName") or args.get("operationName")
+        return query, variables, operation_name
+
+    def get_introspection_key(self, data, pretty):
+        params = self.get_request_params(data)
+        if params is None:
+            return None
+
+        query, variables, operation_name = params
+        if not query or variables:
+            return None
+        if not self.introspection_cache.is_introspection(query, operation_name):
+            return None
+        return query, operation_name, self.get_cache_scope(), pretty
+
+    def get_response_cache(self):
+        # Extension results are per request, cached bytes would replay the
+        # ones of the request that filled the cache. The same goes for the
+        # introspection cache and coalesced executions, whose followers
+        # would skip their own hooks.
+        if self.extensions:
+            return None
+        return self.response_cache
+
+    def should_deduplicate(self):
+        return self.deduplicate and not self.extensions
+
+    async def get_shared_response(self, request_method, data, pretty, response_key):
+        cache_key = None
+        if self.get_response_cache() is not None:
+            cache_key = "response:{}:{}".format(
+                self.get_schema_id(),
+                sha256(repr(response_key).encode("utf8")).hexdigest(),
+            )
+            cached = await self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached, 200
+
+        if self.should_deduplicate():
+            key = (self.schema, response_key)
+            shared = self.inflight.get(key)
+            if shared is None:
+                shared = self.shared_execution = self.inflight.start(
+                    key,
+                    self.execute_and_encode,
+                    request_method,
+                    data,
+                    pretty,
+                    cache_key,
+                )
+            # Shielded, a waiter going away must not cancel the execution the
+            # other requests are waiting on.
+            return await asyncio.shield(shared)
+        return await self.execute_and_encode(request_method, data, pretty, cache_key)
+
+    def get_response_key(self, data, pretty):
+        params = self.get_request_params(data)
+        if params is None or not params[0]:
+            return None
+
+        query, variables, operation_name = params
+        if self.normalize_queries:
+            try:
+                query = self.signature_cache.get(query, operation_name).normalized
+            except GraphQLSyntaxError:
+                pass
+        if isinstance(variables, str):
+            try:
+                variables = json.loads(variables)
+            except ValueError:
+                return None
+        if variables:
+            variables = json.dumps(variables, sort_keys=True, separators=(",", ":"))
+        return query, variables or None, operation_name, self.get_cache_scope(), pretty
 
     async def parse_body(self):
         content_type = request.mimetype
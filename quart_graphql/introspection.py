@@ -0,0 +1,100 @@
+from graphql.language import ast
+from graphql.language.parser import parse
+
+from .cache import PartitionedLRU
+
+INTROSPECTION_FIELDS = frozenset(["__schema", "__type", "__typename"])
+
+
+def get_operation(document_ast, operation_name=None):
+    operations = [
+        definition
+        for definition in document_ast.definitions
+        if isinstance(definition, ast.OperationDefinition)
+    ]
+    if not operation_name:
+        return operations[0] if len(operations) == 1 else None
+
+    for operation in operations:
+        if operation.name and operation.name.value == operation_name:
+            return operation
+    return None
+
+
+def is_introspection_selection_set(selection_set, fragments, visited=None):
+    visited = visited if visited is not None else set()
+    for selection in selection_set.selections:
+        if isinstance(selection, ast.Field):
+            if selection.name.value not in INTROSPECTION_FIELDS:
+                return False
+        elif isinstance(selection, ast.InlineFragment):
+            if not is_introspection_selection_set(
+                selection.selection_set, fragments, visited
+            ):
+                return False
+        elif isinstance(selection, ast.FragmentSpread):
+            name = selection.name.value
+            if name in visited:
+                continue
+            visited.add(name)
+            fragment = fragments.get(name)
+            if fragment is None or not is_introspection_selection_set(
+                fragment.selection_set, fragments, visited
+            ):
+                return False
+    return True
+
+
+def is_introspection_query(query, operation_name=None):
+    # Cheap textual pre-filter so ordinary queries are never parsed here.
+    if not query or ("__schema" not in query and "__type" not in query):
+        return False
+
+    try:
+        document_ast = parse(query)
+    except Exception:
+        return False
+
+    operation = get_operation(document_ast, operation_name)
+    if operation is None or operation.operation != "query":
+        return False
+
+    fragments = {
+        definition.name.value: definition
+        for definition in document_ast.definitions
+        if isinstance(definition, ast.FragmentDefinition)
+    }
+    return is_introspection_selection_set(operation.selection_set, fragments)
+
+
+class IntrospectionCache(object):
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._responses = PartitionedLRU(max_entries)
+        self._detected = {}
+
+    def invalidate(self, schema):
+        self._responses.invalidate(schema)
+
+    def clear(self):
+        self._responses.clear()
+        self._detected.clear()
+
+    def is_introspection(self, query, operation_name=None):
+        key = (query, operation_name)
+        try:
+            return self._detected[key]
+        except KeyError:
+            pass
+
+        detected = is_introspection_query(query, operation_name)
+        if len(self._detected) >= self.max_entries:
+            self._detected.clear()
+        self._detected[key] = detected
+        return detected
+
+    def get(self, schema, key):
+        return self._responses.get(schema, key)
+
+    def set(self, schema, key, response):
+        self._responses.set(schema, key, response)
@@ -0,0 +1,183 @@
+from collections.abc import Mapping, Sized
+from functools import partial
+from inspect import isawaitable
+
+from graphql.error import GraphQLError
+from graphql.execution.middleware import MiddlewareManager
+from promise import Promise, is_thenable
+
+from .extensions import Extension
+from .middleware import CompiledMiddleware
+
+RESULT_TOO_LARGE = "RESULT_TOO_LARGE"
+
+
+class ResultTooLarge(Exception):
+    pass
+
+
+def measure_value(value):
+    # Approximate number of nodes and bytes a resolved value adds to the
+    # encoded result. Objects only count their braces, their fields are
+    # measured when they are resolved.
+    if value is None or isinstance(value, bool):
+        return 0, 5
+    if isinstance(value, str):
+        return 0, len(value) + 2
+    if isinstance(value, (int, float)):
+        return 0, 8
+    if isinstance(value, (Mapping, bytes)) or not isinstance(value, Sized):
+        return 0, 2
+    nodes = len(value)
+    size = nodes + 1
+    for item in value:
+        item_nodes, item_size = measure_value(item)
+        nodes += item_nodes
+        size += item_size
+    return nodes, size
+
+
+class ResultUsage(object):
+    __slots__ = ("limits", "nodes", "bytes", "encoded_bytes", "exceeded")
+
+    def __init__(self, limits):
+        self.limits = limits
+        self.nodes = 0
+        self.bytes = 0
+        self.encoded_bytes = None
+        self.exceeded = None
+
+    def add(self, key, value):
+        nodes, size = measure_value(value)
+        self.nodes += nodes + 1
+        # "key":value,
+        self.bytes += len(key) + size + 4
+        self.check()
+
+    def add_encoded(self, size):
+        self.encoded_bytes = size
+        max_bytes = self.limits.max_bytes
+        if max_bytes is not None and size > max_bytes:
+            self.exceeded = "bytes"
+            return True
+        return False
+
+    def check(self):
+        limits = self.limits
+        if limits.max_nodes is not None and self.nodes > limits.max_nodes:
+            self.exceeded = "nodes"
+        elif limits.max_bytes is not None and self.bytes > limits.max_bytes:
+            self.exceeded = "bytes"
+        else:
+            return
+        raise ResultTooLarge()
+
+    def get_error(self):
+        if self.exceeded == "nodes":
+            message = "Result exceeds the limit of {} nodes.".format(
+                self.limits.max_nodes
+            )
+        else:
+            message = "Result exceeds the limit of {} bytes.".format(
+                self.limits.max_bytes
+            )
+        return GraphQLError(
+            message,
+            extensions={
+                "code": RESULT_TOO_LARGE,
+                "maxNodes": self.limits.max_nodes,
+                "maxBytes": self.limits.max_bytes,
+            },
+        )
+
+    def get_metrics(self):
+        return {
+            "nodes": self.nodes,
+            "bytes": self.bytes,
+            "encodedBytes": self.encoded_bytes,
+            "exceeded": self.exceeded,
+        }
+
+
+class ResultLimits(object):
+    # Bounds the size of the results of a request. Values are measured as
+    # resolvers return them, so an oversized result is abandoned while it is
+    # being completed, and the encoded response is checked again exactly.
+
+    def __init__(self, max_nodes=None, max_bytes=None):
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+
+    def start(self):
+        return ResultUsage(self)
+
+
+def add_usage(usage, key, value):
+    usage.add(key, value)
+    return value
+
+
+async def await_usage(usage, key, value):
+    value = await value
+    usage.add(key, value)
+    return value
+
+
+def resolve_with_limits(next, root, info, **args):
+    usage = getattr(info.context, "usage", None)
+    if usage is None:
+        return next(root, info, **args)
+    # Once the limit is hit the rest of the operation resolves to nothing.
+    if usage.exceeded:
+        return None
+
+    value = next(root, info, **args)
+    key = info.field_asts[0].alias
+    key = key.value if key is not None else info.field_name
+    if is_thenable(value):
+        return Promise.resolve(value).then(partial(add_usage, usage, key))
+    if isawaitable(value):
+        return await_usage(usage, key, value)
+    usage.add(key, value)
+    return value
+
+
+class ResultLimitMiddleware(CompiledMiddleware):
+    # Measures every field, including those a CompiledMiddleware lets bypass
+    # the wrapped middleware (skip_middleware, skip_default_resolvers).
+    __slots__ = ("middleware",)
+
+    def __init__(self, middleware=None):
+        super(ResultLimitMiddleware, self).__init__()
+        if middleware and not isinstance(middleware, MiddlewareManager):
+            middleware = MiddlewareManager(*middleware)
+        self.middleware = middleware or None
+
+    def get_field_resolver(self, field_resolver):
+        try:
+            return self._cached_resolvers[field_resolver]
+        except KeyError:
+            pass
+
+        resolver = field_resolver
+        if self.middleware is not None:
+            resolver = self.middleware.get_field_resolver(field_resolver)
+        resolver = partial(resolve_with_limits, resolver)
+        self._cached_resolvers[field_resolver] = resolver
+        return resolver
+
+
+def limit_middleware(middleware):
+    if isinstance(middleware, ResultLimitMiddleware):
+        return middleware
+    return ResultLimitMiddleware(middleware)
+
+
+class ResultUsageExtension(Extension):
+    # Reports the measured size in the response extensions.
+
+    def get_results(self, context):
+        usage = getattr(context, "usage", None)
+        if usage is None:
+            return None
+        return {"resultUsage": usage.get_metrics()}
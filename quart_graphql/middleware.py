@@ -0,0 +1,48 @@
+from graphql.execution.base import default_resolve_fn
+from graphql.execution.middleware import MiddlewareManager, middleware_chain
+
+SKIP_MIDDLEWARE_ATTRIBUTE = "skip_middleware"
+
+
+def skip_middleware(resolver):
+    setattr(resolver, SKIP_MIDDLEWARE_ATTRIBUTE, True)
+    return resolver
+
+
+class CompiledMiddleware(MiddlewareManager):
+    __slots__ = ("skip_default_resolvers",)
+
+    def __init__(self, *middlewares, **kwargs):
+        kwargs.setdefault("wrap_in_promise", False)
+        super(CompiledMiddleware, self).__init__(*middlewares, **kwargs)
+        # Off by default: default attribute resolvers also serve object and
+        # list fields, which middleware such as permission checks must see.
+        self.skip_default_resolvers = kwargs.get("skip_default_resolvers", False)
+
+    def should_skip(self, field_resolver):
+        if self.skip_default_resolvers and field_resolver is default_resolve_fn:
+            return True
+        return getattr(field_resolver, SKIP_MIDDLEWARE_ATTRIBUTE, False)
+
+    def get_field_resolver(self, field_resolver):
+        try:
+            return self._cached_resolvers[field_resolver]
+        except KeyError:
+            pass
+
+        if self.should_skip(field_resolver):
+            resolver = field_resolver
+        else:
+            resolver = middleware_chain(
+                field_resolver,
+                self._middleware_resolvers,
+                wrap_in_promise=self.wrap_in_promise,
+            )
+        self._cached_resolvers[field_resolver] = resolver
+        return resolver
+
+
+def compile_middleware(middleware, **kwargs):
+    if not middleware or isinstance(middleware, MiddlewareManager):
+        return middleware
+    return CompiledMiddleware(*middleware, **kwargs)
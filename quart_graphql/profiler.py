@@ -0,0 +1,272 @@
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+def get_variables_shape(value):
+    # The structure of the variables with their values replaced by type
+    # names, so profiles can be grouped without logging user data.
+    if isinstance(value, dict):
+        return {key: get_variables_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [get_variables_shape(value[0])] if value else []
+    if value is None:
+        return None
+    return type(value).__name__
+
+
+def format_stack(frame):
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(
+            "{}:{}:{}".format(
+                os.path.basename(code.co_filename), code.co_name, frame.f_lineno
+            )
+        )
+        frame = frame.f_back
+    stack.reverse()
+    return ";".join(stack)
+
+
+class ProfileReport(object):
+    def __init__(
+        self,
+        operation_name,
+        signature,
+        variables_shape,
+        duration,
+        trigger,
+        profile=None,
+        stacks=None,
+    ):
+        self.operation_name = operation_name
+        self.signature = signature
+        self.variables_shape = variables_shape
+        self.duration = duration
+        self.trigger = trigger
+        self.profile = profile
+        self.stacks = stacks
+
+    def get_metadata(self):
+        return {
+            "operation_name": self.operation_name,
+            "signature": self.signature.signature if self.signature else None,
+            "hash": self.signature.hash if self.signature else None,
+            "variables_shape": self.variables_shape,
+            "duration": self.duration,
+            "trigger": self.trigger,
+        }
+
+    def format_stats(self, limit=20):
+        if self.profile is not None:
+            output = io.StringIO()
+            stats = pstats.Stats(self.profile, stream=output)
+            stats.sort_stats("cumulative")
+            if limit is None:
+                stats.print_stats()
+            else:
+                stats.print_stats(limit)
+            return output.getvalue()
+        # Collapsed stacks, the input format of flame graph tools.
+        return "\n".join(
+            "{} {}".format(stack, count)
+            for stack, count in (self.stacks or Counter()).most_common(limit)
+        )
+
+
+class ProfileSink(object):
+    async def write(self, report):
+        raise NotImplementedError(
+            "write method not implemented in {}.".format(self.__class__)
+        )
+
+
+class LoggingSink(ProfileSink):
+    def __init__(self, logger=logger, level=logging.WARNING, limit=20):
+        self.logger = logger
+        self.level = level
+        self.limit = limit
+
+    async def write(self, report):
+        self.logger.log(
+            self.level,
+            "Profiled GraphQL request: %s\n%s",
+            json.dumps(report.get_metadata(), sort_keys=True),
+            report.format_stats(self.limit),
+        )
+
+
+class FileSink(ProfileSink):
+    # Writes <time>-<hash>.prof (cProfile, readable with pstats or snakeviz)
+    # or .folded (collapsed stacks) next to a .json file with the metadata.
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    async def write(self, report):
+        metadata = report.get_metadata()
+        name = os.path.join(
+            self.directory,
+            "{}-{}".format(int(time.time() * 1000), (metadata["hash"] or "none")[:16]),
+        )
+        if report.profile is not None:
+            report.profile.dump_stats(name + ".prof")
+        else:
+            with open(name + ".folded", "w") as f:
+                f.write(report.format_stats(limit=None))
+        with open(name + ".json", "w") as f:
+            json.dump(metadata, f, sort_keys=True)
+        return name
+
+
+class ProfileSession(object):
+    __slots__ = ("context", "trigger", "started", "thread_id", "profile", "stacks")
+
+    def __init__(self, context, trigger, started, thread_id):
+        self.context = context
+        self.trigger = trigger
+        self.started = started
+        self.thread_id = thread_id
+        self.profile = None
+        self.stacks = None
+
+
+class Profiler(object):
+    # Requests are profiled when they are sampled, carry the header or, in
+    # "stack" mode, take longer than threshold seconds. "stack" mode samples
+    # the event loop thread from a background thread, "cprofile" mode
+    # instruments the request and can't be combined with a threshold. Both
+    # also record the other requests running on the same loop meanwhile.
+
+    def __init__(
+        self,
+        sink,
+        threshold=None,
+        sample_rate=0.0,
+        header=None,
+        mode="stack",
+        interval=0.005,
+        sample=random.random,
+        clock=time.perf_counter,
+    ):
+        if mode not in ("stack", "cprofile"):
+            raise ValueError("Profiler mode must be 'stack' or 'cprofile'.")
+        if mode == "cprofile" and threshold is not None:
+            raise ValueError("A profiling threshold requires the 'stack' mode.")
+
+        self.sink = sink
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.header = header
+        self.mode = mode
+        self.interval = interval
+        self.sample = sample
+        self.clock = clock
+        self._sessions = {}
+        self._wakeup = threading.Event()
+        self._sampler = None
+        self._profiling = False
+
+    def get_trigger(self, context):
+        if self.header and context.headers.get(self.header):
+            return "header"
+        if self.sample_rate and self.sample() < self.sample_rate:
+            return "sample"
+        return None
+
+    def start(self, context):
+        trigger = self.get_trigger(context)
+        if trigger is None and self.threshold is None:
+            return None
+
+        session = ProfileSession(context, trigger, self.clock(), threading.get_ident())
+        if self.mode == "cprofile":
+            # Only one deterministic profiler can be active per thread.
+            if self._profiling:
+                return None
+            self._profiling = True
+            session.profile = cProfile.Profile()
+            session.profile.enable()
+        else:
+            session.stacks = Counter()
+            self._sessions[id(session)] = session
+            self.ensure_sampler()
+            self._wakeup.set()
+        return session
+
+    async def finish(self, session, get_signature=None):
+        duration = self.clock() - session.started
+        if session.profile is not None:
+            session.profile.disable()
+            self._profiling = False
+        else:
+            self._sessions.pop(id(session), None)
+
+        trigger = session.trigger
+        if trigger is None and duration >= self.threshold:
+            trigger = "threshold"
+        if trigger is None:
+            return None
+
+        context = session.context
+        params = context.params
+        try:
+            signature = get_signature() if get_signature is not None else None
+        except Exception:
+            signature = None
+        report = ProfileReport(
+            params.operation_name if params is not None else None,
+            signature,
+            get_variables_shape(params.variables) if params is not None else None,
+            duration,
+            trigger,
+            session.profile,
+            session.stacks,
+        )
+        try:
+            await self.sink.write(report)
+        except Exception:
+            logger.exception("Failed to write GraphQL profile.")
+        return report
+
+    def ensure_sampler(self):
+        if self._sampler is None:
+            self._sampler = threading.Thread(
+                target=self.run_sampler, name="quart-graphql-profiler", daemon=True
+            )
+            self._sampler.start()
+
+    def run_sampler(self):
+        while True:
+            self._wakeup.clear()
+            if not self._sessions:
+                self._wakeup.wait()
+            time.sleep(self.interval)
+            self.take_sample()
+
+    def take_sample(self):
+        sessions = list(self._sessions.values())
+        if not sessions:
+            return
+        frames = sys._current_frames()
+        stacks = {}
+        for session in sessions:
+            frame = frames.get(session.thread_id)
+            if frame is None:
+                continue
+            stack = stacks.get(session.thread_id)
+            if stack is None:
+                stack = stacks[session.thread_id] = format_stack(frame)
+            session.stacks[stack] += 1
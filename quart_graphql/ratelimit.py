@@ -0,0 +1,201 @@
+import math
+import time
+from collections import OrderedDict
+
+from graphql.language import ast
+from graphql_server import HttpQueryError
+
+from .introspection import get_operation
+
+LIST_ARGUMENTS = ("first", "last", "limit")
+
+
+def get_list_size(field, default_list_size, list_arguments):
+    for argument in field.arguments or ():
+        if argument.name.value not in list_arguments:
+            continue
+        if isinstance(argument.value, ast.IntValue):
+            return max(int(argument.value.value), 0)
+        return default_list_size
+    return 1
+
+
+def get_selection_set_cost(
+    selection_set, fragments, visited, default_list_size, list_arguments
+):
+    cost = 0
+    for selection in selection_set.selections:
+        if isinstance(selection, ast.Field):
+            cost += 1
+            if selection.selection_set is not None:
+                cost += get_list_size(
+                    selection, default_list_size, list_arguments
+                ) * get_selection_set_cost(
+                    selection.selection_set,
+                    fragments,
+                    visited,
+                    default_list_size,
+                    list_arguments,
+                )
+        elif isinstance(selection, ast.InlineFragment):
+            cost += get_selection_set_cost(
+                selection.selection_set,
+                fragments,
+                visited,
+                default_list_size,
+                list_arguments,
+            )
+        elif isinstance(selection, ast.FragmentSpread):
+            name = selection.name.value
+            if name in visited or name not in fragments:
+                continue
+            cost += get_selection_set_cost(
+                fragments[name].selection_set,
+                fragments,
+                visited | {name},
+                default_list_size,
+                list_arguments,
+            )
+    return cost
+
+
+def get_query_cost(
+    document_ast,
+    operation_name=None,
+    default_list_size=10,
+    list_arguments=LIST_ARGUMENTS,
+):
+    # Every field costs one, the selections of a field with a literal
+    # `first`, `last` or `limit` argument are multiplied by it. Sizes bound
+    # to variables count as `default_list_size`, so the cost of a document
+    # never depends on the variables and can be memoized by its text.
+    operation = get_operation(document_ast, operation_name)
+    if operation is None:
+        return 1
+
+    fragments = {
+        definition.name.value: definition
+        for definition in document_ast.definitions
+        if isinstance(definition, ast.FragmentDefinition)
+    }
+    cost = get_selection_set_cost(
+        operation.selection_set,
+        fragments,
+        frozenset(),
+        default_list_size,
+        list_arguments,
+    )
+    return max(cost, 1)
+
+
+class MemoryTokenStorage(object):
+    def __init__(self, max_keys=10000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    async def consume(self, key, cost, rate, capacity):
+        now = self.clock()
+        try:
+            tokens, updated = self._buckets[key]
+        except KeyError:
+            tokens, updated = capacity, now
+        else:
+            self._buckets.move_to_end(key)
+
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        # Evicted clients start again with a full bucket.
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+class CacheTokenStorage(object):
+    # Keeps buckets in a quart_graphql.cache.CacheBackend so they are shared
+    # between workers. Reading and writing a bucket isn't atomic, concurrent
+    # requests of one client on different workers may both be let through.
+
+    def __init__(self, cache, prefix="ratelimit:", clock=time.time):
+        self.cache = cache
+        self.prefix = prefix
+        self.clock = clock
+
+    async def consume(self, key, cost, rate, capacity):
+        key = self.prefix + str(key)
+        now = self.clock()
+        bucket = await self.cache.get(key)
+        tokens, updated = bucket if bucket is not None else (capacity, now)
+
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        # Once refilled the bucket is the same as a missing one.
+        await self.cache.set(key, (tokens, now), (capacity - tokens) / rate + 1)
+        return allowed, tokens
+
+
+class RateLimiter(object):
+    def __init__(
+        self,
+        identify,
+        rate=10.0,
+        capacity=100.0,
+        storage=None,
+        get_cost=get_query_cost,
+        max_entries=1024,
+    ):
+        self.identify = identify
+        self.rate = rate
+        self.capacity = capacity
+        self.storage = storage if storage is not None else MemoryTokenStorage()
+        self.get_cost = get_cost
+        self.max_entries = max_entries
+        self._costs = OrderedDict()
+
+    def get_cached_cost(self, query, operation_name=None):
+        key = (query, operation_name)
+        try:
+            cost = self._costs[key]
+        except KeyError:
+            return None
+        self._costs.move_to_end(key)
+        return cost
+
+    def compute_cost(self, query, operation_name, document_ast):
+        cost = self.get_cost(document_ast, operation_name)
+        self._costs[(query, operation_name)] = cost
+        if len(self._costs) > self.max_entries:
+            self._costs.popitem(last=False)
+        return cost
+
+    async def consume(self, context, cost):
+        client = self.identify(context)
+        if client is None:
+            return
+
+        if cost > self.capacity:
+            raise HttpQueryError(
+                400,
+                "Query cost {} exceeds the rate limit of {}.".format(
+                    cost, self.capacity
+                ),
+            )
+
+        allowed, tokens = await self.storage.consume(
+            client, cost, self.rate, self.capacity
+        )
+        if not allowed:
+            retry_after = math.ceil((cost - tokens) / self.rate)
+            raise HttpQueryError(
+                429,
+                "Rate limit exceeded.",
+                headers={"Retry-After": str(retry_after)},
+            )
@@ -0,0 +1,157 @@
+import asyncio
+
+from graphql.language.parser import parse
+from graphql.type.schema import GraphQLSchema
+from graphql.validation import validate
+
+from .cache import get_document_cache_key
+from .signature import compute_schema_hash, get_schema_hash
+
+
+def warm_schema(schema):
+    # Work the first request for a schema would otherwise do: its hash, part
+    # of the document and response cache keys, prints the whole schema.
+    return compute_schema_hash(schema)
+
+
+def parse_documents(schema, queries):
+    # Parses and validates queries against a schema that isn't served yet,
+    # from a worker thread: it only touches its arguments.
+    documents = {}
+    for query in queries:
+        try:
+            document_ast = parse(query)
+        except Exception:
+            continue
+        if not validate(schema, document_ast):
+            documents[query] = document_ast
+    return documents
+
+
+def prepare_schema(schema, queries):
+    return warm_schema(schema), parse_documents(schema, queries)
+
+
+class SchemaRegistry(object):
+    # Schemas served from a single route, picked per request by a URL variable
+    # of the route or a header, falling back to the default name. The caches
+    # of the view are shared by all of them and partitioned per schema.
+    #
+    # Replacing a schema swaps it atomically: requests that already picked
+    # the old one finish with it, later ones get the new one, and only the
+    # cache partitions of the old schema are dropped.
+
+    def __init__(self, schemas=None, header=None, view_arg=None, default=None):
+        self.header = header
+        self.view_arg = view_arg
+        self.default = default
+        self._schemas = {}
+        self._hashes = {}
+        self._caches = []
+        self._document_caches = []
+        for name, schema in (schemas or {}).items():
+            self.register(name, schema)
+
+    def __len__(self):
+        return len(self._schemas)
+
+    def __contains__(self, name):
+        return name in self._schemas
+
+    def register(self, name, schema):
+        if not isinstance(schema, GraphQLSchema):
+            raise ValueError(
+                "A Schema is required to be registered as {!r}.".format(name)
+            )
+        if schema not in self._hashes:
+            self._hashes[schema] = warm_schema(schema)
+        self.swap(name, schema)
+
+    async def reload(self, name, schema, executor=None):
+        # Warms the new schema and parses the queries cached for the old one
+        # in a worker thread, then stores their documents and builds their
+        # plans before the swap, so the first requests on the new schema find
+        # warm caches.
+        if not isinstance(schema, GraphQLSchema):
+            raise ValueError(
+                "A Schema is required to be registered as {!r}.".format(name)
+            )
+        old = self._schemas.get(name)
+        prepared = []
+        if old is not None and old is not schema:
+            for cache in self._caches:
+                get_keys = getattr(cache, "get_keys", None)
+                if get_keys is not None:
+                    prepared.append((cache, get_keys(old)))
+
+        queries = {key[0] for cache, keys in prepared for key in keys}
+        loop = asyncio.get_event_loop()
+        schema_hash, documents = await loop.run_in_executor(
+            executor, prepare_schema, schema, queries
+        )
+        for cache, keys in prepared:
+            for key in keys:
+                document_ast = documents.get(key[0])
+                if document_ast is not None:
+                    cache.prepare(schema, key, document_ast)
+        for document_cache in self._document_caches:
+            for query, document_ast in documents.items():
+                await document_cache.set(
+                    get_document_cache_key(schema_hash, query), document_ast
+                )
+
+        self._hashes[schema] = schema_hash
+        self.swap(name, schema)
+        return old
+
+    def swap(self, name, schema):
+        old = self._schemas.get(name)
+        self._schemas[name] = schema
+        if old is not None and old is not schema:
+            self.release(old)
+
+    def unregister(self, name):
+        schema = self._schemas.pop(name, None)
+        if schema is not None:
+            self.release(schema)
+        return schema
+
+    def release(self, schema):
+        # Another name may still serve the same schema object.
+        if any(served is schema for served in self._schemas.values()):
+            return
+        self._hashes.pop(schema, None)
+        for cache in self._caches:
+            cache.invalidate(schema)
+
+    def add_cache(self, cache):
+        if all(cache is not added for added in self._caches):
+            self._caches.append(cache)
+
+    def add_document_cache(self, cache):
+        if all(cache is not added for added in self._document_caches):
+            self._document_caches.append(cache)
+
+    def get(self, name):
+        return self._schemas.get(name)
+
+    def get_schema_hash(self, schema):
+        # Kept for as long as the schema is served, however many there are.
+        schema_hash = self._hashes.get(schema)
+        if schema_hash is None:
+            schema_hash = get_schema_hash(schema)
+        return schema_hash
+
+    def get_schema_name(self, request):
+        name = None
+        if self.view_arg is not None:
+            name = (request.view_args or {}).get(self.view_arg)
+        if name is None and self.header is not None:
+            name = request.headers.get(self.header)
+        return self.default if name is None else name
+
+    def select(self, request):
+        name = self.get_schema_name(request)
+        if name is None:
+            return None
+        return self._schemas.get(name)
@@ -1,6 +1,6 @@
 from quart import render_template_string
 
-GRAPHIQL_VERSION = "0.11.11"
+from .assets import GRAPHIQL_VERSION, get_cdn_urls
 
 TEMPLATE = """<!--
 The request to this GraphQL server provided the header "Accept: text/html"
@@ -22,11 +22,11 @@ add "&raw" to the end of the URL within a browser.
     }
   </style>
   <meta name="referrer" content="no-referrer">
-  <link href="//cdn.jsdelivr.net/npm/graphiql@{{graphiql_version}}/graphiql.css" rel="stylesheet" />
-  <script src="//cdn.jsdelivr.net/fetch/0.9.0/fetch.min.js"></script>
-  <script src="//cdn.jsdelivr.net/react/15.0.0/react.min.js"></script>
-  <script src="//cdn.jsdelivr.net/react/15.0.0/react-dom.min.js"></script>
-  <script src="//cdn.jsdelivr.net/npm/graphiql@{{graphiql_version}}/graphiql.min.js"></script>
+  <link href="{{asset_urls['graphiql.css']}}" rel="stylesheet" />
+  <script src="{{asset_urls['fetch.min.js']}}"></script>
+  <script src="{{asset_urls['react.min.js']}}"></script>
+  <script src="{{asset_urls['react-dom.min.js']}}"></script>
+  <script src="{{asset_urls['graphiql.min.js']}}"></script>
 </head>
 <body>
   <script>
@@ -130,14 +130,17 @@ async def render_graphiql(
     graphiql_version=None,
     graphiql_template=None,
     graphiql_html_title=None,
+    asset_urls=None,
 ):
     graphiql_version = graphiql_version or GRAPHIQL_VERSION
     template = graphiql_template or TEMPLATE
+    asset_urls = asset_urls or get_cdn_urls(graphiql_version)
 
     return await render_template_string(
         template,
         graphiql_version=graphiql_version,
         graphiql_html_title=graphiql_html_title,
+        asset_urls=asset_urls,
         result=result,
         params=params,
     )
@@ -0,0 +1,457 @@
+import json
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from inspect import iscoroutinefunction
+from json.encoder import encode_basestring_ascii
+
+from graphql.execution.base import ResolveInfo
+from graphql.execution.utils import default_resolve_fn
+from graphql.execution.values import get_argument_values, get_variable_values
+from graphql.language import ast
+from graphql.type import (
+    GraphQLEnumType,
+    GraphQLInt,
+    GraphQLInterfaceType,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLObjectType,
+    GraphQLScalarType,
+    GraphQLString,
+    GraphQLUnionType,
+)
+from graphql.utils.type_from_ast import type_from_ast
+from promise import is_thenable
+
+from .cache import MISSING, PartitionedLRU
+from .introspection import get_operation
+from .variables import MAX_INT, MIN_INT
+
+
+class Unsupported(Exception):
+    # The document uses something the compiled serializers don't handle.
+    pass
+
+
+class Fallback(Exception):
+    # Raised while serializing when graphql-core has to complete the
+    # operation instead, e.g. to report an error.
+    pass
+
+
+class JSONData(object):
+    # Data of an execution result that is already encoded as JSON.
+    __slots__ = ("json",)
+
+    def __init__(self, json):
+        self.json = json
+
+
+def encode_value(value):
+    if isinstance(value, str):
+        return encode_basestring_ascii(value)
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if isinstance(value, float) and math.isfinite(value):
+        return float.__repr__(value)
+    if value is None:
+        raise Fallback()
+    return json.dumps(value, separators=(",", ":"))
+
+
+def serialize_string(value):
+    if type(value) is str:
+        return encode_basestring_ascii(value)
+    return encode_value(GraphQLString.serialize(value))
+
+
+def serialize_int(value):
+    if type(value) is int and MIN_INT <= value <= MAX_INT:
+        return int.__repr__(value)
+    try:
+        return encode_value(GraphQLInt.serialize(value))
+    except Fallback:
+        raise
+    except Exception:
+        raise Fallback()
+
+
+def get_leaf_serializer(return_type):
+    if return_type is GraphQLString:
+        return serialize_string
+    if return_type is GraphQLInt:
+        return serialize_int
+
+    serialize = return_type.serialize
+
+    def serialize_leaf(value):
+        try:
+            return encode_value(serialize(value))
+        except Fallback:
+            raise
+        except Exception:
+            raise Fallback()
+
+    return serialize_leaf
+
+
+def get_path(path):
+    keys = []
+    while path is not None:
+        path, key = path
+        keys.append(key)
+    keys.reverse()
+    return keys
+
+
+class ExecutionState(object):
+    __slots__ = ("root_value", "context", "variable_values", "argument_values")
+
+    def __init__(self, root_value, context, variable_values):
+        self.root_value = root_value
+        self.context = context
+        self.variable_values = variable_values
+        self.argument_values = {}
+
+
+def has_variables(node):
+    if isinstance(node, ast.Variable):
+        return True
+    if isinstance(node, ast.ListValue):
+        return any(has_variables(value) for value in node.values)
+    if isinstance(node, ast.ObjectValue):
+        return any(has_variables(field.value) for field in node.fields)
+    return False
+
+
+class SerializationPlan(object):
+    # Completes and encodes a query in one pass, with a serializer compiled
+    # per selection of an object type and one per leaf type, instead of
+    # building the OrderedDict tree and encoding it afterwards.
+
+    def __init__(self, schema, document_ast, operation, middleware=None):
+        self.schema = schema
+        self.operation = operation
+        self.middleware = middleware
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document_ast.definitions
+            if isinstance(definition, ast.FragmentDefinition)
+        }
+        self._leaf_serializers = {}
+        self.serialize_root = self.compile_selections(
+            schema.get_query_type(), [operation.selection_set]
+        )
+
+    def execute(self, root_value=None, context=None, variables=None):
+        try:
+            variable_values = get_variable_values(
+                self.schema, self.operation.variable_definitions or [], variables
+            )
+        except Exception:
+            raise Fallback()
+        state = ExecutionState(root_value, context, variable_values)
+        return self.serialize_root(root_value, state, None)
+
+    def does_fragment_condition_match(self, fragment, parent_type):
+        if fragment.type_condition is None:
+            return True
+        conditional_type = type_from_ast(self.schema, fragment.type_condition)
+        if conditional_type is parent_type:
+            return True
+        if isinstance(conditional_type, (GraphQLInterfaceType, GraphQLUnionType)):
+            return self.schema.is_possible_type(conditional_type, parent_type)
+        return False
+
+    def collect_fields(self, parent_type, selection_set, fields, visited):
+        for selection in selection_set.selections:
+            if selection.directives:
+                raise Unsupported()
+            if isinstance(selection, ast.Field):
+                key = selection.alias.value if selection.alias else selection.name.value
+                fields.setdefault(key, []).append(selection)
+            elif isinstance(selection, ast.InlineFragment):
+                if self.does_fragment_condition_match(selection, parent_type):
+                    self.collect_fields(
+                        parent_type, selection.selection_set, fields, visited
+                    )
+            else:
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                if name in visited or fragment is None:
+                    continue
+                visited.add(name)
+                if fragment.directives:
+                    raise Unsupported()
+                if self.does_fragment_condition_match(fragment, parent_type):
+                    self.collect_fields(
+                        parent_type, fragment.selection_set, fields, visited
+                    )
+        return fields
+
+    def compile_selections(self, parent_type, selection_sets):
+        fields = OrderedDict()
+        visited = set()
+        for selection_set in selection_sets:
+            self.collect_fields(parent_type, selection_set, fields, visited)
+
+        serializers = []
+        for key, field_asts in fields.items():
+            name = field_asts[0].name.value
+            if name == "__typename":
+                serialize = self.compile_typename(parent_type)
+            elif name.startswith("__"):
+                raise Unsupported()
+            else:
+                field_def = parent_type.fields.get(name)
+                if field_def is None:
+                    continue
+                serialize = self.compile_field(parent_type, field_def, key, field_asts)
+            serializers.append((encode_basestring_ascii(key) + ":", serialize))
+
+        def serialize_object(source, state, path):
+            return (
+                "{"
+                + ",".join(
+                    [
+                        prefix + serialize(source, state, path)
+                        for prefix, serialize in serializers
+                    ]
+                )
+                + "}"
+            )
+
+        return serialize_object
+
+    def compile_typename(self, parent_type):
+        typename = encode_basestring_ascii(parent_type.name)
+        return lambda source, state, path: typename
+
+    def compile_field(self, parent_type, field_def, key, field_asts):
+        field_ast = field_asts[0]
+        name = field_ast.name.value
+        return_type = field_def.type
+        # Awaitable results can't be completed in one synchronous pass.
+        if iscoroutinefunction(field_def.resolver):
+            raise Unsupported()
+        resolver = field_def.resolver or default_resolve_fn
+        if self.middleware:
+            resolver = self.middleware.get_field_resolver(resolver)
+        complete = self.compile_type(return_type, field_asts)
+
+        if resolver is default_resolve_fn:
+
+            def serialize_field(source, state, path):
+                if isinstance(source, dict):
+                    value = source.get(name)
+                else:
+                    value = getattr(source, name, None)
+                if callable(value):
+                    value = value()
+                return complete(value, state, (path, key))
+
+            return serialize_field
+
+        static_args = None
+        if not any(
+            has_variables(argument.value) for argument in field_ast.arguments or ()
+        ):
+            static_args = get_argument_values(field_def.args, field_ast.arguments, {})
+        schema = self.schema
+        fragments = self.fragments
+        operation = self.operation
+
+        def serialize_field(source, state, path):
+            args = static_args
+            if args is None:
+                args = state.argument_values.get(field_ast)
+                if args is None:
+                    args = state.argument_values[field_ast] = get_argument_values(
+                        field_def.args, field_ast.arguments, state.variable_values
+                    )
+            field_path = (path, key)
+            info = ResolveInfo(
+                name,
+                field_asts,
+                return_type,
+                parent_type,
+                schema=schema,
+                fragments=fragments,
+                root_value=state.root_value,
+                operation=operation,
+                variable_values=state.variable_values,
+                context=state.context,
+                path=get_path(field_path),
+            )
+            try:
+                value = resolver(source, info, **args)
+            except Exception:
+                raise Fallback()
+            if isinstance(value, Exception) or is_thenable(value):
+                raise Fallback()
+            return complete(value, state, field_path)
+
+        return serialize_field
+
+    def compile_type(self, return_type, field_asts):
+        if isinstance(return_type, GraphQLNonNull):
+            complete = self.compile_nullable_type(return_type.of_type, field_asts)
+
+            def complete_nonnull(value, state, path):
+                if value is None:
+                    raise Fallback()
+                return complete(value, state, path)
+
+            return complete_nonnull
+
+        complete = self.compile_nullable_type(return_type, field_asts)
+
+        def complete_nullable(value, state, path):
+            if value is None:
+                return "null"
+            return complete(value, state, path)
+
+        return complete_nullable
+
+    def compile_nullable_type(self, return_type, field_asts):
+        if isinstance(return_type, GraphQLList):
+            complete_item = self.compile_type(return_type.of_type, field_asts)
+
+            def complete_list(value, state, path):
+                if not isinstance(value, Iterable):
+                    raise Fallback()
+                return (
+                    "["
+                    + ",".join(
+                        [
+                            complete_item(item, state, (path, index))
+                            for index, item in enumerate(value)
+                        ]
+                    )
+                    + "]"
+                )
+
+            return complete_list
+
+        if isinstance(return_type, (GraphQLScalarType, GraphQLEnumType)):
+            serialize = self._leaf_serializers.get(return_type)
+            if serialize is None:
+                serialize = self._leaf_serializers[return_type] = get_leaf_serializer(
+                    return_type
+                )
+            return lambda value, state, path: serialize(value)
+
+        # is_type_of checks need a ResolveInfo, leave those types to graphql-core.
+        if isinstance(return_type, GraphQLObjectType) and not return_type.is_type_of:
+            serialize_object = self.compile_selections(
+                return_type,
+                [
+                    field_ast.selection_set
+                    for field_ast in field_asts
+                    if field_ast.selection_set
+                ],
+            )
+            return serialize_object
+
+        raise Unsupported()
+
+
+def get_serialization_plan(schema, document_ast, operation_name=None, middleware=None):
+    operation = get_operation(document_ast, operation_name)
+    if operation is None or operation.operation != "query" or operation.directives:
+        return None
+    try:
+        return SerializationPlan(schema, document_ast, operation, middleware)
+    except Unsupported:
+        return None
+
+
+class SerializerCache(object):
+    # A plan that falls back wasted a run of its resolvers. After
+    # max_fallbacks consecutive fallbacks the document goes straight to
+    # graphql-core for retry_after seconds, then the plan is tried again,
+    # so a transient error or an occasional null doesn't disable it for good.
+
+    def __init__(self, max_entries=256, max_fallbacks=3, retry_after=60):
+        self.max_entries = max_entries
+        self.max_fallbacks = max_fallbacks
+        self.retry_after = retry_after
+        self._plans = PartitionedLRU(max_entries)
+        self._fallbacks = PartitionedLRU(max_entries)
+
+    def __len__(self):
+        return len(self._plans)
+
+    def get_plan(
+        self, schema, query, document_ast, operation_name=None, middleware=None
+    ):
+        key = (query, operation_name, middleware)
+        plan = self._plans.get(schema, key, MISSING)
+        if type(plan) is float:
+            # Disabled until then.
+            if plan > time.monotonic():
+                return None
+            plan = MISSING
+        if plan is MISSING:
+            plan = get_serialization_plan(
+                schema, document_ast, operation_name, middleware
+            )
+            self._plans.set(schema, key, plan)
+        return plan
+
+    def record_fallback(self, schema, query, operation_name=None, middleware=None):
+        key = (query, operation_name, middleware)
+        fallbacks = self._fallbacks.get(schema, key, 0) + 1
+        self._fallbacks.set(schema, key, fallbacks)
+        if fallbacks >= self.max_fallbacks:
+            self._plans.set(schema, key, time.monotonic() + self.retry_after)
+
+    def record_success(self, schema, query, operation_name=None, middleware=None):
+        if len(self._fallbacks):
+            self._fallbacks.pop(schema, (query, operation_name, middleware))
+
+    def get_keys(self, schema):
+        return self._plans.keys(schema)
+
+    def prepare(self, schema, key, document_ast):
+        query, operation_name, middleware = key
+        self.get_plan(schema, query, document_ast, operation_name, middleware)
+
+    def invalidate(self, schema):
+        self._plans.invalidate(schema)
+        self._fallbacks.invalidate(schema)
+
+
+def load_json_data(result):
+    if isinstance(result, (list, tuple)):
+        return [load_json_data(entry) for entry in result]
+    if not isinstance(result, dict) or not isinstance(result.get("data"), JSONData):
+        return result
+    result = result.copy()
+    result["data"] = json.loads(result["data"].json, object_pairs_hook=OrderedDict)
+    return result
+
+
+def encode_result(result, encode, pretty=False):
+    # Splices pre-encoded data into the encoded response.
+    if pretty:
+        return encode(load_json_data(result), pretty=True)
+    if isinstance(result, (list, tuple)):
+        return "[" + ",".join(encode_result(entry, encode) for entry in result) + "]"
+    if not isinstance(result, dict) or not isinstance(result.get("data"), JSONData):
+        return encode(result)
+    return (
+        "{"
+        + ",".join(
+            encode(key)
+            + ":"
+            + (value.json if isinstance(value, JSONData) else encode(value))
+            for key, value in result.items()
+        )
+        + "}"
+    )
@@ -0,0 +1,216 @@
+import re
+import threading
+from collections import OrderedDict, namedtuple
+from hashlib import sha256
+from itertools import count
+
+from graphql.language import ast
+from graphql.language.parser import parse
+from graphql.language.printer import PrintingVisitor, join, wrap
+from graphql.language.visitor import visit
+from graphql.utils.schema_printer import print_schema
+
+from .introspection import get_operation
+
+QuerySignature = namedtuple("QuerySignature", "normalized signature hash")
+
+LITERAL = "$_"
+
+MAX_SCHEMA_HASHES = 32
+
+_schema_hashes = OrderedDict()
+_schema_hashes_lock = threading.Lock()
+
+
+class CompactPrintingVisitor(PrintingVisitor):
+    __slots__ = ()
+
+    def order(self, items):
+        return items
+
+    def leave_Document(self, node, *args):
+        return join(node.definitions, " ")
+
+    def leave_OperationDefinition(self, node, *args):
+        name = node.name
+        var_defs = wrap("(", join(self.order(node.variable_definitions), ","), ")")
+        directives = join(self.order(node.directives), " ")
+
+        if not name and not directives and not var_defs and node.operation == "query":
+            return node.selection_set
+
+        head = join([node.operation, name], " ") + var_defs
+        return join([head, directives], " ") + node.selection_set
+
+    def leave_VariableDefinition(self, node, *args):
+        return node.variable + ":" + node.type + wrap("=", node.default_value)
+
+    def leave_SelectionSet(self, node, *args):
+        return "{" + join(self.order(node.selections), " ") + "}"
+
+    def leave_Field(self, node, *args):
+        return (
+            wrap("", node.alias, ":")
+            + node.name
+            + wrap("(", join(self.order(node.arguments), ","), ")")
+            + wrap(" ", join(self.order(node.directives), " "))
+            + (node.selection_set or "")
+        )
+
+    def leave_Argument(self, node, *args):
+        return node.name + ":" + node.value
+
+    def leave_FragmentSpread(self, node, *args):
+        return "..." + node.name + wrap(" ", join(node.directives, " "))
+
+    def leave_InlineFragment(self, node, *args):
+        return (
+            "..."
+            + wrap("on ", node.type_condition)
+            + wrap(" ", join(node.directives, " "))
+            + node.selection_set
+        )
+
+    def leave_FragmentDefinition(self, node, *args):
+        return (
+            "fragment {} on {}".format(node.name, node.type_condition)
+            + wrap(" ", join(node.directives, " "))
+            + node.selection_set
+        )
+
+    def leave_ListValue(self, node, *args):
+        return "[" + join(node.values, ",") + "]"
+
+    def leave_ObjectValue(self, node, *args):
+        return "{" + join(node.fields, ",") + "}"
+
+    def leave_ObjectField(self, node, *args):
+        return node.name + ":" + node.value
+
+    def leave_Directive(self, node, *args):
+        return "@" + node.name + wrap("(", join(self.order(node.arguments), ","), ")")
+
+
+class SignaturePrintingVisitor(CompactPrintingVisitor):
+    # Literals are hoisted out as placeholder variables and selections,
+    # arguments and directives are sorted, so operations that only differ in
+    # formatting, ordering or inline values share a signature.
+    __slots__ = ()
+
+    def leave_IntValue(self, node, *args):
+        return LITERAL
+
+    leave_FloatValue = leave_IntValue
+    leave_StringValue = leave_IntValue
+    leave_BooleanValue = leave_IntValue
+    leave_EnumValue = leave_IntValue
+    leave_ListValue = leave_IntValue
+    leave_ObjectValue = leave_IntValue
+
+    def leave_VariableDefinition(self, node, *args):
+        return node.variable + ":" + node.type
+
+    def order(self, items):
+        return sorted(items or [])
+
+
+def print_compact(document_ast):
+    return visit(document_ast, CompactPrintingVisitor())
+
+
+def get_used_fragments(selection_set, fragments, used):
+    for selection in selection_set.selections:
+        if isinstance(selection, ast.FragmentSpread):
+            name = selection.name.value
+            if name not in used and name in fragments:
+                used[name] = fragments[name]
+                get_used_fragments(fragments[name].selection_set, fragments, used)
+        elif selection.selection_set is not None:
+            get_used_fragments(selection.selection_set, fragments, used)
+    return used
+
+
+def number_literals(signature):
+    counter = count()
+    return re.sub(
+        re.escape(LITERAL) + r"(?!\w)",
+        lambda match: "$_{}".format(next(counter)),
+        signature,
+    )
+
+
+def print_signature(document_ast, operation_name=None):
+    operation = get_operation(document_ast, operation_name)
+    if operation is None:
+        return print_compact(document_ast)
+
+    fragments = {
+        definition.name.value: definition
+        for definition in document_ast.definitions
+        if isinstance(definition, ast.FragmentDefinition)
+    }
+    used = get_used_fragments(operation.selection_set, fragments, OrderedDict())
+    document = ast.Document(
+        definitions=[operation] + [used[name] for name in sorted(used)]
+    )
+    return number_literals(visit(document, SignaturePrintingVisitor()))
+
+
+def get_query_signature(query, operation_name=None, document_ast=None):
+    if document_ast is None:
+        document_ast = parse(query)
+
+    normalized = print_compact(document_ast)
+    signature = print_signature(document_ast, operation_name)
+    return QuerySignature(
+        normalized, signature, sha256(signature.encode("utf8")).hexdigest()
+    )
+
+
+class SignatureCache(object):
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._signatures = OrderedDict()
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def get(self, query, operation_name=None, document_ast=None):
+        key = (query, operation_name)
+        try:
+            signature = self._signatures[key]
+        except KeyError:
+            pass
+        else:
+            self._signatures.move_to_end(key)
+            return signature
+
+        signature = get_query_signature(query, operation_name, document_ast)
+        self._signatures[key] = signature
+        if len(self._signatures) > self.max_entries:
+            self._signatures.popitem(last=False)
+        return signature
+
+
+def compute_schema_hash(schema):
+    # SHA-256 of the printed schema, the same in every process serving it,
+    # unlike graphql-core's get_unique_schema_id which hashes the repr of the
+    # object.
+    return sha256(print_schema(schema).encode("utf8")).hexdigest()
+
+
+def get_schema_hash(schema):
+    # Printed once per schema object for views serving a single schema,
+    # registries keep the hash of each schema they serve themselves.
+    with _schema_hashes_lock:
+        schema_hash = _schema_hashes.get(schema)
+        if schema_hash is not None:
+            _schema_hashes.move_to_end(schema)
+            return schema_hash
+
+    schema_hash = compute_schema_hash(schema)
+    with _schema_hashes_lock:
+        _schema_hashes[schema] = schema_hash
+        if len(_schema_hashes) > MAX_SCHEMA_HASHES:
+            _schema_hashes.popitem(last=False)
+    return schema_hash
@@ -0,0 +1,36 @@
+import asyncio
+from functools import partial
+
+
+class SingleFlight(object):
+    def __init__(self):
+        self._calls = {}
+
+    def __len__(self):
+        return len(self._calls)
+
+    def get(self, key):
+        return self._calls.get(key)
+
+    def start(self, key, func, *args, **kwargs):
+        # The shared work runs in a task of its own, so the request that
+        # started it going away doesn't cancel it for the others.
+        task = asyncio.ensure_future(func(*args, **kwargs))
+        self._calls[key] = task
+        task.add_done_callback(partial(self.forget, key))
+        return task
+
+    async def do(self, key, func, *args, **kwargs):
+        task = self._calls.get(key)
+        if task is None:
+            task = self.start(key, func, *args, **kwargs)
+        # Shield the shared task, a waiter going away must not cancel the
+        # execution the other requests are waiting on.
+        return await asyncio.shield(task)
+
+    def forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved, the waiters re-raise it anyway.
+        if not task.cancelled():
+            task.exception()
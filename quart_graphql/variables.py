@@ -0,0 +1,271 @@
+import json
+from collections import OrderedDict
+
+from graphql.execution import ExecutionResult
+from graphql.execution.executor import execute_operation
+from graphql.execution.executors.sync import SyncExecutor
+from graphql.execution.middleware import MiddlewareManager
+from graphql.execution.utils import ExecutionContext
+from graphql.language import ast
+from graphql.type import (
+    GraphQLBoolean,
+    GraphQLFloat,
+    GraphQLID,
+    GraphQLInt,
+    GraphQLString,
+)
+from graphql.utils.type_from_ast import type_from_ast
+from graphql.utils.value_from_ast import value_from_ast
+from graphql_server import HttpQueryError
+from promise import Promise
+
+from .cache import MISSING, PartitionedLRU
+from .introspection import get_operation
+
+MIN_INT = -2147483648
+MAX_INT = 2147483647
+
+# Returned by coercers for values they can't vouch for, graphql-core then
+# coerces the whole operation itself and reports any error.
+SKIP = object()
+
+
+def coerce_string(value):
+    return value if type(value) is str else SKIP
+
+
+def coerce_id(value):
+    if type(value) is str:
+        return value
+    if type(value) is int:
+        return str(value)
+    return SKIP
+
+
+def coerce_int(value):
+    if type(value) is int and MIN_INT <= value <= MAX_INT:
+        return value
+    return SKIP
+
+
+def coerce_float(value):
+    if type(value) is float:
+        return value
+    if type(value) is int:
+        return float(value)
+    return SKIP
+
+
+def coerce_boolean(value):
+    return value if type(value) is bool else SKIP
+
+
+SCALAR_COERCERS = {
+    "String": (GraphQLString, coerce_string),
+    "ID": (GraphQLID, coerce_id),
+    "Int": (GraphQLInt, coerce_int),
+    "Float": (GraphQLFloat, coerce_float),
+    "Boolean": (GraphQLBoolean, coerce_boolean),
+}
+
+
+class CoercionPlan(object):
+    # Variables of an operation resolved once against the schema. The plan
+    # keeps a copy of the document without variable definitions, so an
+    # execution context built from it doesn't coerce the variables again.
+    __slots__ = ("document_ast", "variables")
+
+    def __init__(self, document_ast, variables):
+        self.document_ast = document_ast
+        self.variables = variables
+
+    def coerce(self, inputs):
+        inputs = inputs or {}
+        values = {}
+        for name, coerce, required, default in self.variables:
+            value = inputs.get(name)
+            if value is None:
+                if required:
+                    return None
+                if default is not None:
+                    values[name] = default
+                continue
+
+            value = coerce(value)
+            if value is SKIP:
+                return None
+            values[name] = value
+        return values
+
+
+def get_scalar_coercer(schema, type_ast):
+    if not isinstance(type_ast, ast.NamedType):
+        return None
+    scalar, coerce = SCALAR_COERCERS.get(type_ast.name.value, (None, None))
+    # Only the built in scalars, a schema may define its own type by that name.
+    if scalar is None or schema.get_type(type_ast.name.value) is not scalar:
+        return None
+    return coerce
+
+
+def get_coercion_plan(schema, document_ast, operation_name=None):
+    operation = get_operation(document_ast, operation_name)
+    if operation is None or not operation.variable_definitions:
+        return None
+
+    variables = []
+    for definition in operation.variable_definitions:
+        type_ast = definition.type
+        required = isinstance(type_ast, ast.NonNullType)
+        if required:
+            type_ast = type_ast.type
+
+        coerce = get_scalar_coercer(schema, type_ast)
+        if coerce is None:
+            return None
+
+        default = None
+        if definition.default_value is not None:
+            default = value_from_ast(
+                definition.default_value, type_from_ast(schema, definition.type)
+            )
+        variables.append((definition.variable.name.value, coerce, required, default))
+
+    planned_operation = ast.OperationDefinition(
+        operation=operation.operation,
+        name=operation.name,
+        variable_definitions=None,
+        directives=operation.directives,
+        selection_set=operation.selection_set,
+        loc=operation.loc,
+    )
+    definitions = [
+        planned_operation if definition is operation else definition
+        for definition in document_ast.definitions
+    ]
+    return CoercionPlan(ast.Document(definitions, loc=document_ast.loc), variables)
+
+
+class PlannedExecutionContext(ExecutionContext):
+    __slots__ = ()
+
+    def __init__(self, schema, plan, variable_values, *args):
+        super(PlannedExecutionContext, self).__init__(schema, plan.document_ast, *args)
+        self.variable_values = variable_values
+
+
+def execute_with_plan(
+    schema,
+    plan,
+    variable_values,
+    root=None,
+    context=None,
+    operation_name=None,
+    executor=None,
+    return_promise=False,
+    middleware=None,
+):
+    # Mirrors graphql.execution.executor.execute for queries and mutations,
+    # with variables already coerced by the plan.
+    if middleware and not isinstance(middleware, MiddlewareManager):
+        middleware = MiddlewareManager(*middleware)
+    if executor is None:
+        executor = SyncExecutor()
+
+    exe_context = PlannedExecutionContext(
+        schema,
+        plan,
+        variable_values,
+        root,
+        context,
+        None,
+        operation_name,
+        executor,
+        middleware,
+        False,
+    )
+
+    def promise_executor(v):
+        return execute_operation(exe_context, exe_context.operation, root)
+
+    def on_rejected(error):
+        exe_context.errors.append(error)
+        return None
+
+    def on_resolve(data):
+        if not exe_context.errors:
+            return ExecutionResult(data=data)
+        return ExecutionResult(data=data, errors=exe_context.errors)
+
+    promise = (
+        Promise.resolve(None).then(promise_executor).catch(on_rejected).then(on_resolve)
+    )
+
+    if not return_promise:
+        exe_context.executor.wait_until_finished()
+        return promise.get()
+
+    clean = getattr(exe_context.executor, "clean", None)
+    if clean:
+        clean()
+    return promise
+
+
+class VariablesCache(object):
+    # Coercion plans per document and operation, plus the decoded form of
+    # recently seen variable strings. Decoded payloads are shared between
+    # requests and must be treated as read only.
+
+    def __init__(self, max_entries=1024, max_payloads=256, max_payload_size=4096):
+        self.max_entries = max_entries
+        self.max_payloads = max_payloads
+        self.max_payload_size = max_payload_size
+        self._plans = PartitionedLRU(max_entries)
+        self._payloads = OrderedDict()
+
+    def __len__(self):
+        return len(self._plans)
+
+    def get_plan(self, schema, query, document_ast, operation_name=None):
+        key = (query, operation_name)
+        plan = self._plans.get(schema, key, MISSING)
+        if plan is MISSING:
+            plan = get_coercion_plan(schema, document_ast, operation_name)
+            self._plans.set(schema, key, plan)
+        return plan
+
+    def get_keys(self, schema):
+        return self._plans.keys(schema)
+
+    def prepare(self, schema, key, document_ast):
+        query, operation_name = key
+        self.get_plan(schema, query, document_ast, operation_name)
+
+    def invalidate(self, schema):
+        self._plans.invalidate(schema)
+
+    def load(self, variables):
+        if not variables or not isinstance(variables, str):
+            return variables
+        if len(variables) > self.max_payload_size:
+            return self.decode(variables)
+
+        try:
+            value = self._payloads[variables]
+        except KeyError:
+            pass
+        else:
+            self._payloads.move_to_end(variables)
+            return value
+
+        value = self.decode(variables)
+        self._payloads[variables] = value
+        if len(self._payloads) > self.max_payloads:
+            self._payloads.popitem(last=False)
+        return value
+
+    def decode(self, variables):
+        try:
+            return json.loads(variables)
+        except Exception:
+            raise HttpQueryError(400, "Variables are invalid JSON.")
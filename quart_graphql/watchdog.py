@@ -0,0 +1,178 @@
+import asyncio
+import json
+import logging
+import sys
+import threading
+import time
+
+from graphql.execution.base import ResolveInfo
+
+from .context import RequestContext
+from .profiler import format_stack
+
+logger = logging.getLogger(__name__)
+
+
+class BlockingReport(object):
+    def __init__(
+        self,
+        duration,
+        operation_name=None,
+        signature=None,
+        field=None,
+        path=None,
+        function=None,
+        stack=None,
+    ):
+        self.duration = duration
+        self.operation_name = operation_name
+        self.signature = signature
+        self.field = field
+        self.path = path
+        self.function = function
+        self.stack = stack
+
+    def get_metadata(self):
+        return {
+            "duration": self.duration,
+            "operation_name": self.operation_name,
+            "hash": self.signature.hash if self.signature else None,
+            "field": self.field,
+            "path": self.path,
+            "function": self.function,
+        }
+
+
+def get_frame_function(frame):
+    code = frame.f_code
+    return "{}:{}:{}".format(
+        code.co_filename, getattr(code, "co_qualname", code.co_name), frame.f_lineno
+    )
+
+
+def find_running_request(frame):
+    # The innermost frame with a ResolveInfo is the resolver (or the
+    # graphql-core code completing its value), the view holds the context.
+    while frame is not None:
+        local_vars = frame.f_locals
+        info = local_vars.get("info")
+        if isinstance(info, ResolveInfo):
+            return info.context, info, frame
+        context = getattr(local_vars.get("self"), "request_context", None)
+        if isinstance(context, RequestContext):
+            return context, None, frame
+        frame = frame.f_back
+    return None, None, None
+
+
+def create_report(duration, frame):
+    if frame is None:
+        return BlockingReport(duration)
+
+    context, info, running = find_running_request(frame)
+    report = BlockingReport(duration, stack=format_stack(frame))
+    if info is not None:
+        report.field = "{}.{}".format(info.parent_type.name, info.field_name)
+        report.path = info.path
+        report.function = get_frame_function(running)
+        if info.operation.name is not None:
+            report.operation_name = info.operation.name.value
+    if isinstance(context, RequestContext):
+        if context.params is not None:
+            report.operation_name = context.params.operation_name
+        report.signature = context.signature
+    return report
+
+
+def log_report(report):
+    logger.warning(
+        "Event loop blocked for %.3fs: %s\n%s",
+        report.duration,
+        json.dumps(report.get_metadata(), sort_keys=True, default=str),
+        (report.stack or "").replace(";", "\n"),
+    )
+
+
+class LoopWatchdog(object):
+    # Measures how late a callback scheduled every interval seconds runs on
+    # the event loop. A background thread notices when the loop hasn't
+    # ticked for threshold seconds and records the stack of the loop thread,
+    # and the operation and resolver blocking it. Once the loop runs again
+    # the whole span is reported to the handlers, from the loop.
+
+    def __init__(self, threshold=0.1, interval=None, handlers=None, clock=None):
+        self.threshold = threshold
+        self.interval = interval or min(threshold / 4, 0.05)
+        self.handlers = list(handlers) if handlers is not None else [log_report]
+        self.clock = clock or time.monotonic
+        self.blocked_count = 0
+        self.blocked_time = 0.0
+        self.max_lag = 0.0
+        self._loop = None
+        self._thread_id = None
+        self._heartbeat = None
+        self._captured = None
+        self._handle = None
+        self._stopped = None
+
+    def is_running(self):
+        return self._loop is not None
+
+    def start(self, loop=None):
+        if self._loop is not None:
+            return
+        self._loop = loop or asyncio.get_event_loop()
+        self._thread_id = threading.get_ident()
+        self._heartbeat = self.clock()
+        self._stopped = threading.Event()
+        self._handle = self._loop.call_later(self.interval, self.tick)
+        threading.Thread(
+            target=self.run_monitor,
+            args=(self._stopped,),
+            name="quart-graphql-watchdog",
+            daemon=True,
+        ).start()
+
+    def stop(self):
+        if self._loop is None:
+            return
+        self._stopped.set()
+        self._handle.cancel()
+        self._loop = self._handle = None
+
+    def get_metrics(self):
+        return {
+            "blocked_count": self.blocked_count,
+            "blocked_time": self.blocked_time,
+            "max_lag": self.max_lag,
+        }
+
+    def tick(self):
+        now = self.clock()
+        lag = now - self._heartbeat - self.interval
+        self._heartbeat = now
+        self.max_lag = max(self.max_lag, lag)
+        captured, self._captured = self._captured, None
+        if self._loop is not None:
+            self._handle = self._loop.call_later(self.interval, self.tick)
+        if lag >= self.threshold:
+            self.blocked_count += 1
+            self.blocked_time += lag
+            report = captured or BlockingReport(lag)
+            report.duration = lag
+            for handler in self.handlers:
+                try:
+                    handler(report)
+                except Exception:
+                    logger.exception("Failed to report a blocked event loop.")
+
+    def run_monitor(self, stopped):
+        while not stopped.wait(self.interval):
+            heartbeat = self._heartbeat
+            if self._captured is not None or heartbeat is None:
+                continue
+            if self.clock() - heartbeat >= self.threshold:
+                # Read the frames while the loop is still stuck in them.
+                frame = sys._current_frames().get(self._thread_id)
+                self._captured = create_report(None, frame)
+                del frame
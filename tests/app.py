@@ -10,11 +10,10 @@ def create_app(path="/graphql", **kwargs):
     app = Quart(__name__)
     app.debug = True
     app.config['TESTING'] = True
+    kwargs.setdefault("schema", Schema)
     app.add_url_rule(
         path,
-        view_func=AsyncGraphQLView.as_view(
-            "graphql", schema=Schema, backend=backend, **kwargs
-        ),
+        view_func=AsyncGraphQLView.as_view("graphql", backend=backend, **kwargs),
     )
     return app
 
@@ -0,0 +1,120 @@
+import gzip
+import typing
+
+import pytest
+
+from quart_graphql.assets import (
+    GRAPHIQL_ASSETS,
+    GRAPHIQL_VERSION,
+    AssetStore,
+    get_cdn_urls,
+    vendor_assets,
+)
+from tests.app import create_app
+
+
+def fetch(url):
+    return ("/* %s */" % url).encode("utf8")
+
+
+@pytest.fixture
+def assets(tmp_path) -> AssetStore:
+    vendor_assets("1.0.0", str(tmp_path), fetch=fetch)
+    return AssetStore("1.0.0", str(tmp_path))
+
+
+def test_vendor_assets(tmp_path) -> typing.NoReturn:
+    paths = vendor_assets("1.0.0", str(tmp_path), fetch=fetch)
+    assert len(paths) == len(GRAPHIQL_ASSETS)
+    with open(str(tmp_path / "1.0.0" / "graphiql.css.gz"), "rb") as f:
+        assert gzip.decompress(f.read()) == fetch(
+            "https://cdn.jsdelivr.net/npm/graphiql@1.0.0/graphiql.css"
+        )
+
+
+def test_asset_store(assets: AssetStore, tmp_path) -> typing.NoReturn:
+    assert assets.is_available()
+    asset = assets.get("graphiql.min.js")
+    assert asset.content_type == "application/javascript; charset=utf-8"
+    assert gzip.decompress(asset.gzip_body) == asset.body
+    assert assets.get("graphiql.min.js") is asset
+    assert assets.get("../secret") is None
+    assert not AssetStore("2.0.0", str(tmp_path)).is_available()
+
+
+@pytest.mark.asyncio
+async def test_graphiql_uses_local_assets(assets: AssetStore) -> typing.NoReturn:
+    app = create_app(graphiql=True, graphiql_assets=assets, graphiql_push_assets=True)
+    client = app.test_client()
+    response = await client.get("/graphql", headers={"Accept": "text/html"})
+    assert response.status_code == 200
+    html = (await response.get_data()).decode()
+    assert "cdn.jsdelivr.net" not in html
+    assert '<script src="/graphql?graphiql_asset=1.0.0%2Fgraphiql.min.js">' in html
+    assert response.headers["Link"].startswith(
+        "</graphql?graphiql_asset=1.0.0%2Fgraphiql.css>; rel=preload; as=style, "
+    )
+    assert len(client.push_promises) == len(GRAPHIQL_ASSETS)
+
+
+@pytest.mark.asyncio
+async def test_serves_precompressed_assets(assets: AssetStore) -> typing.NoReturn:
+    app = create_app(graphiql=True, graphiql_assets=assets)
+    client = app.test_client()
+    url = "/graphql?graphiql_asset=1.0.0/graphiql.css"
+    asset = assets.get("graphiql.css")
+
+    response = await client.get(url, headers={"Accept-Encoding": "gzip, br"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Content-Type"] == "text/css; charset=utf-8"
+    assert response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    assert await response.get_data() == asset.gzip_body
+
+    response = await client.get(url)
+    assert "Content-Encoding" not in response.headers
+    assert await response.get_data() == asset.body
+
+    response = await client.get(
+        url, headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status_code == 304
+
+    response = await client.get("/graphql?graphiql_asset=0.1.0/graphiql.css")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_graphiql_falls_back_to_cdn(tmp_path) -> typing.NoReturn:
+    app = create_app(graphiql=True, graphiql_assets=AssetStore("1.0.0", str(tmp_path)))
+    response = await app.test_client().get("/graphql", headers={"Accept": "text/html"})
+    html = (await response.get_data()).decode()
+    assert get_cdn_urls()["graphiql.min.js"] in html
+    assert "Link" not in response.headers
+
+
+shipped_assets = AssetStore()
+
+
+@pytest.mark.asyncio
+async def test_serves_shipped_assets() -> typing.NoReturn:
+    assert (
+        shipped_assets.is_available()
+    ), "GraphiQL assets are not vendored, run python -m quart_graphql.assets"
+    app = create_app(graphiql=True)
+    client = app.test_client()
+    response = await client.get("/graphql", headers={"Accept": "text/html"})
+    html = (await response.get_data()).decode()
+    assert "cdn.jsdelivr.net" not in html
+    assert len(response.headers["Link"].split(", ")) == len(GRAPHIQL_ASSETS)
+
+    for name in GRAPHIQL_ASSETS:
+        asset = shipped_assets.get(name)
+        assert asset.body
+        assert gzip.decompress(asset.gzip_body) == asset.body
+        response = await client.get(
+            "/graphql?graphiql_asset={}/{}".format(GRAPHIQL_VERSION, name),
+            headers={"Accept-Encoding": "gzip"},
+        )
+        assert response.status_code == 200
+        assert await response.get_data() == asset.gzip_body
@@ -0,0 +1,247 @@
+import json
+import os
+import pickle
+import subprocess
+import sys
+import typing
+from hashlib import sha256
+from urllib.parse import urlencode
+
+import pytest
+from quart import Quart
+from quart.testing import QuartClient
+
+from quart_graphql.cache import (
+    FileCache,
+    KeyValueCache,
+    LocalKeyValueStore,
+    MemoryCache,
+)
+from quart_graphql.signature import get_schema_hash
+from tests.app import create_app
+from tests.schema import Schema
+
+document_cache = MemoryCache()
+persisted_query_cache = KeyValueCache(LocalKeyValueStore())
+response_cache = MemoryCache()
+
+
+@pytest.fixture
+async def app() -> Quart:
+    app = create_app(
+        document_cache=document_cache,
+        persisted_query_cache=persisted_query_cache,
+        response_cache=response_cache,
+    )
+    ctx = app.app_context()
+    await ctx.push()
+    return app
+
+
+@pytest.fixture
+def client(app: Quart) -> QuartClient:
+    return app.test_client()
+
+
+def url_string(url_params: typing.Dict) -> str:
+    return "/graphql?" + urlencode(url_params)
+
+
+async def response_json(response) -> typing.Dict:
+    return json.loads(await response.get_data())
+
+
+@pytest.fixture(params=["memory", "file", "key_value"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCache(max_entries=2)
+    if request.param == "file":
+        return FileCache(str(tmp_path), max_entries=2)
+    return KeyValueCache(LocalKeyValueStore())
+
+
+@pytest.mark.asyncio
+async def test_cache_backends_roundtrip(cache) -> typing.NoReturn:
+    assert await cache.get("missing") is None
+    await cache.set("key", {"value": [1, 2]})
+    assert await cache.get("key") == {"value": [1, 2]}
+    await cache.delete("key")
+    assert await cache.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_cache_backends_expire_entries(cache) -> typing.NoReturn:
+    await cache.set("key", "value", ttl=-1)
+    assert await cache.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_evicts_least_recently_used() -> typing.NoReturn:
+    cache = MemoryCache(max_entries=2)
+    await cache.set("a", 1)
+    await cache.set("b", 2)
+    await cache.get("a")
+    await cache.set("c", 3)
+    assert await cache.get("b") is None
+    assert await cache.get("a") == 1
+    assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_file_cache_is_shared_between_instances(tmp_path) -> typing.NoReturn:
+    await FileCache(str(tmp_path)).set("key", b"shared")
+    assert await FileCache(str(tmp_path)).get("key") == b"shared"
+
+
+def test_schema_hash_is_stable_across_processes() -> typing.NoReturn:
+    script = (
+        "from quart_graphql.signature import get_schema_hash\n"
+        "from tests.schema import Schema\n"
+        "print(get_schema_hash(Schema))"
+    )
+    output = subprocess.check_output([sys.executable, "-c", script])
+    assert output.decode("utf8").strip() == get_schema_hash(Schema)
+
+
+@pytest.mark.asyncio
+async def test_document_cache_is_keyed_by_schema_hash(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    query = "query Hash { test }"
+    await client.get(url_string({"query": query}))
+    key = "document:{}:{}".format(
+        get_schema_hash(Schema), sha256(query.encode("utf8")).hexdigest()
+    )
+    assert await document_cache.get(key) is not None
+
+
+@pytest.mark.asyncio
+async def test_caches_validated_documents(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    await document_cache.clear()
+    response = await client.get(url_string({"query": "{ test }"}))
+    assert response.status_code == 200
+    assert len(document_cache) == 1
+
+    response = await client.get(url_string({"query": "{ test }"}))
+    assert await response_json(response) == {"data": {"test": "Hello World"}}
+
+    response = await client.get(url_string({"query": "{ unknown }"}))
+    assert response.status_code == 400
+    assert len(document_cache) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["file", "key_value"])
+async def test_caches_documents_in_shared_backends(
+    backend, tmp_path
+) -> typing.NoReturn:
+    if backend == "file":
+        cache = FileCache(str(tmp_path))
+    else:
+        cache = KeyValueCache(LocalKeyValueStore())
+    app = create_app(document_cache=cache)
+    client = app.test_client()
+    query = "{ test }"
+    key = "document:{}:{}".format(
+        get_schema_hash(Schema), sha256(query.encode("utf8")).hexdigest()
+    )
+
+    response = await client.get(url_string({"query": query}))
+    assert response.status_code == 200
+    assert await cache.get(key) is not None
+
+    response = await client.get(url_string({"query": query}))
+    assert await response_json(response) == {"data": {"test": "Hello World"}}
+
+
+class Planted(object):
+    def __reduce__(self):
+        return (os.system, ("true",))
+
+
+@pytest.mark.asyncio
+async def test_shared_backends_refuse_arbitrary_objects(tmp_path) -> typing.NoReturn:
+    cache = FileCache(str(tmp_path))
+    with open(cache.get_path("key"), "wb") as f:
+        pickle.dump(("key", None, Planted()), f)
+    assert await cache.get("key") is None
+
+    store = LocalKeyValueStore()
+    await store.set("quart-graphql:key", pickle.dumps(Planted()))
+    assert await KeyValueCache(store).get("key") is None
+
+
+def test_file_cache_requires_a_private_directory(tmp_path) -> typing.NoReturn:
+    directory = tmp_path / "cache"
+    directory.mkdir(mode=0o777)
+    directory.chmod(0o777)
+    with pytest.raises(ValueError):
+        FileCache(str(directory))
+
+    link = tmp_path / "link"
+    link.symlink_to(tmp_path / "private")
+    (tmp_path / "private").mkdir(mode=0o700)
+    with pytest.raises(ValueError):
+        FileCache(str(link))
+
+
+@pytest.mark.asyncio
+async def test_persisted_queries(app: Quart, client: QuartClient) -> typing.NoReturn:
+    query = "{ test }"
+    extensions = {
+        "persistedQuery": {
+            "version": 1,
+            "sha256Hash": sha256(query.encode("utf8")).hexdigest(),
+        }
+    }
+
+    response = await client.post("/graphql", json={"extensions": extensions})
+    assert response.status_code == 200
+    assert await response_json(response) == {
+        "errors": [{"message": "PersistedQueryNotFound"}]
+    }
+
+    response = await client.post(
+        "/graphql", json={"query": query, "extensions": extensions}
+    )
+    assert await response_json(response) == {"data": {"test": "Hello World"}}
+
+    response = await client.get(url_string({"extensions": json.dumps(extensions)}))
+    assert response.status_code == 200
+    assert await response_json(response) == {"data": {"test": "Hello World"}}
+
+
+@pytest.mark.asyncio
+async def test_persisted_query_hash_must_match(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    response = await client.post(
+        "/graphql",
+        json={
+            "query": "{ test }",
+            "extensions": {"persistedQuery": {"version": 1, "sha256Hash": "nope"}},
+        },
+    )
+    assert response.status_code == 400
+    assert await response_json(response) == {
+        "errors": [{"message": "Provided sha256Hash does not match query."}]
+    }
+
+
+@pytest.mark.asyncio
+async def test_caches_successful_get_responses(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    await response_cache.clear()
+    response = await client.get(url_string({"query": "{ request }", "q": "first"}))
+    assert await response_json(response) == {"data": {"request": "first"}}
+    assert len(response_cache) == 1
+
+    response = await client.get(url_string({"query": "{ request }", "q": "second"}))
+    assert await response_json(response) == {"data": {"request": "first"}}
+
+    response = await client.get(url_string({"query": "{ thrower }"}))
+    assert response.status_code == 200
+    assert len(response_cache) == 1
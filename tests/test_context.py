@@ -0,0 +1,112 @@
+import json
+import typing
+
+import pytest
+from graphql.type.definition import GraphQLField, GraphQLObjectType
+from graphql.type.scalars import GraphQLString
+from graphql.type.schema import GraphQLSchema
+
+from quart_graphql import RequestContext
+from tests.app import create_app
+
+
+class FakeRequest(object):
+    args = {"q": "testing"}
+    headers = {"X-Test": "1"}
+    method = "GET"
+    path = "/graphql"
+
+
+def test_context_has_no_instance_dict() -> typing.NoReturn:
+    context = RequestContext(FakeRequest())
+    assert not hasattr(context, "__dict__")
+    with pytest.raises(AttributeError):
+        context.something_else = True
+
+
+def test_context_exposes_request_data() -> typing.NoReturn:
+    request = FakeRequest()
+    context = RequestContext(request, user="someone")
+    assert context.request is request
+    assert context.user == "someone"
+    assert context.args == {"q": "testing"}
+    assert context.headers == {"X-Test": "1"}
+    assert context.method == "GET"
+    assert context.path == "/graphql"
+    with pytest.raises(AttributeError):
+        context.missing
+
+
+@pytest.mark.asyncio
+async def test_context_runs_cleanup_callbacks_in_reverse() -> typing.NoReturn:
+    context = RequestContext(FakeRequest())
+    closed = []
+
+    async def close_async():
+        closed.append("async")
+
+    context.add_cleanup(lambda: closed.append("sync"))
+    context.add_cleanup(close_async)
+    await context.close()
+    assert closed == ["async", "sync"]
+
+
+@pytest.mark.asyncio
+async def test_context_cleanup_logs_failures(caplog) -> typing.NoReturn:
+    context = RequestContext(FakeRequest())
+    closed = []
+
+    def fail():
+        raise ValueError("boom")
+
+    context.add_cleanup(lambda: closed.append("first"))
+    context.add_cleanup(fail)
+    await context.close()
+    assert closed == ["first"]
+    assert "Request context cleanup failed." in caplog.text
+
+
+closed = []
+
+
+def resolve_with_cleanup(obj, info):
+    info.context.add_cleanup(lambda: closed.append(info.context.method))
+    return info.context.args.get("q")
+
+
+def resolve_with_failing_cleanup(obj, info):
+    def fail():
+        raise ValueError("boom")
+
+    info.context.add_cleanup(fail)
+    return "failing"
+
+
+CleanupSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="CleanupQuery",
+        fields={
+            "request": GraphQLField(GraphQLString, resolver=resolve_with_cleanup),
+            "failing": GraphQLField(
+                GraphQLString, resolver=resolve_with_failing_cleanup
+            ),
+        },
+    )
+)
+
+
+@pytest.mark.asyncio
+async def test_view_closes_context_after_request() -> typing.NoReturn:
+    app = create_app(schema=CleanupSchema)
+    response = await app.test_client().get("/graphql?query={request}&q=cleanup")
+    assert response.status_code == 200
+    assert json.loads(await response.get_data()) == {"data": {"request": "cleanup"}}
+    assert closed == ["GET"]
+
+
+@pytest.mark.asyncio
+async def test_failing_cleanup_keeps_the_response() -> typing.NoReturn:
+    app = create_app(schema=CleanupSchema)
+    response = await app.test_client().get("/graphql?query={failing}")
+    assert response.status_code == 200
+    assert json.loads(await response.get_data()) == {"data": {"failing": "failing"}}
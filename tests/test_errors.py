@@ -0,0 +1,96 @@
+import json
+import typing
+
+import pytest
+from graphql import graphql
+from graphql.type.definition import GraphQLField, GraphQLList, GraphQLObjectType
+from graphql.type.scalars import GraphQLString
+from graphql.type.schema import GraphQLSchema
+
+from quart_graphql.errors import ErrorPipeline
+from tests.app import create_app
+
+
+def resolve_broken(obj, info):
+    raise Exception("Broken %s" % obj["kind"])
+
+
+Item = GraphQLObjectType(
+    name="Item",
+    fields={"broken": GraphQLField(GraphQLString, resolver=resolve_broken)},
+)
+
+Schema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "items": GraphQLField(
+                GraphQLList(Item),
+                resolver=lambda *_: [{"kind": "item"}] * 5 + [{"kind": "other"}],
+            )
+        },
+    )
+)
+
+
+def execute_errors(**options):
+    result = graphql(Schema, "{ items { broken } }")
+    return ErrorPipeline(**options).format_errors(result.errors)
+
+
+def test_deduplicates_messages_and_aggregates_paths() -> typing.NoReturn:
+    errors = execute_errors()
+    assert [error["message"] for error in errors] == ["Broken item", "Broken other"]
+    assert errors[0]["path"] == ["items", 0, "broken"]
+    assert errors[0]["extensions"] == {
+        "count": 5,
+        "paths": [["items", index, "broken"] for index in range(5)],
+    }
+    assert "extensions" not in errors[1]
+
+
+def test_caps_errors_and_paths() -> typing.NoReturn:
+    errors = execute_errors(max_errors=1, max_paths=2)
+    assert errors[0]["extensions"]["paths"] == [
+        ["items", 0, "broken"],
+        ["items", 1, "broken"],
+    ]
+    assert errors[1] == {"message": "1 more errors were omitted."}
+
+    errors = execute_errors(deduplicate=False, max_errors=3)
+    assert len(errors) == 4
+    assert errors[-1] == {"message": "3 more errors were omitted."}
+
+
+def test_samples_tracebacks() -> typing.NoReturn:
+    errors = execute_errors(traceback_sample_rate=0.5, sample=lambda: 0.9)
+    assert all("traceback" not in error.get("extensions", {}) for error in errors)
+
+    errors = execute_errors(traceback_sample_rate=0.5, sample=lambda: 0.1)
+    assert all(error["extensions"]["traceback"] for error in errors)
+    assert "resolve_broken" in "".join(errors[0]["extensions"]["traceback"])
+
+
+def test_middleware_drops_unsampled_tracebacks() -> typing.NoReturn:
+    pipeline = ErrorPipeline(traceback_sample_rate=0.5, sample=lambda: 0.9)
+    result = graphql(Schema, "{ items { broken } }", middleware=[pipeline])
+    assert len(result.errors) == 6
+    assert all(error.original_error.__traceback__ is None for error in result.errors)
+    assert all(
+        "traceback" not in e.get("extensions", {})
+        for e in pipeline.format_errors(result.errors)
+    )
+
+
+@pytest.mark.asyncio
+async def test_view_uses_error_pipeline() -> typing.NoReturn:
+    pipeline = ErrorPipeline(max_errors=1)
+    app = create_app(schema=Schema, error_pipeline=pipeline, middleware=[pipeline])
+    response = await app.test_client().get("/graphql?query={ items { broken } }")
+    assert response.status_code == 200
+    result = json.loads(await response.get_data())
+    assert result["data"] == {"items": [{"broken": None}] * 6}
+    assert [error["message"] for error in result["errors"]] == [
+        "Broken item",
+        "1 more errors were omitted.",
+    ]
@@ -0,0 +1,253 @@
+import asyncio
+import json
+import typing
+from urllib.parse import urlencode
+
+import pytest
+from graphql.type.definition import GraphQLField, GraphQLObjectType
+from graphql.type.scalars import GraphQLString
+from graphql.type.schema import GraphQLSchema
+from quart import Quart, url_for
+from quart.testing import QuartClient
+
+from quart_graphql.cache import MemoryCache
+from quart_graphql.extensions import Extension
+from tests.app import create_app
+
+
+class RecordingExtension(Extension):
+    def __init__(self, name):
+        self.name = name
+
+    def record(self, context, event):
+        events.append("%s:%s" % (self.name, event))
+
+    async def on_request_start(self, context):
+        self.record(context, "request_start")
+
+    async def on_request_end(self, context):
+        self.record(context, "request_end")
+
+    async def on_parse_start(self, context):
+        self.record(context, "parse_start")
+
+    async def on_parse_end(self, context):
+        self.record(context, "parse_end")
+
+    async def on_validate_start(self, context):
+        self.record(context, "validate_start")
+
+    async def on_validate_end(self, context):
+        self.record(context, "validate_end")
+
+    async def on_execute_start(self, context):
+        self.record(context, "execute_start")
+
+    async def on_execute_end(self, context):
+        self.record(context, "execute_end")
+
+    async def on_encode_start(self, context):
+        self.record(context, "encode_start")
+
+    async def on_encode_end(self, context):
+        self.record(context, "encode_end")
+
+
+class OperationNameExtension(Extension):
+    def get_results(self, context):
+        return {"operation": context.params.operation_name}
+
+
+events = []
+
+
+@pytest.fixture
+async def app() -> Quart:
+    app = create_app(
+        extensions=[
+            RecordingExtension("outer"),
+            RecordingExtension("inner"),
+            OperationNameExtension(),
+        ],
+        batch=True,
+    )
+    ctx = app.app_context()
+    await ctx.push()
+    return app
+
+
+@pytest.fixture
+def client(app: Quart) -> QuartClient:
+    return app.test_client()
+
+
+async def url_string(app: Quart, url_params: typing.Dict) -> str:
+    async with app.test_request_context("/"):
+        string = url_for("graphql")
+        if url_params:
+            string += "?" + urlencode(url_params)
+        return string
+
+
+@pytest.mark.asyncio
+async def test_hooks_wrap_every_phase(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    del events[:]
+    response = await client.get(await url_string(app, {"query": "{test}"}))
+    assert response.status_code == 200
+
+    expected = ["outer:request_start", "inner:request_start"]
+    for phase in ["parse", "validate", "execute", "encode"]:
+        expected += ["outer:%s_start" % phase, "inner:%s_start" % phase]
+        expected += ["inner:%s_end" % phase, "outer:%s_end" % phase]
+    expected += ["inner:request_end", "outer:request_end"]
+    assert events == expected
+
+
+@pytest.mark.asyncio
+async def test_extensions_contribute_to_response(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    response = await client.get(
+        await url_string(
+            app, {"query": "query Hello { test }", "operationName": "Hello"}
+        )
+    )
+    assert response.status_code == 200
+    assert json.loads(await response.get_data()) == {
+        "data": {"test": "Hello World"},
+        "extensions": {"operation": "Hello"},
+    }
+
+
+@pytest.mark.asyncio
+async def test_validation_errors_skip_execution(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    del events[:]
+    response = await client.get(await url_string(app, {"query": "{ unknown }"}))
+    assert response.status_code == 400
+    assert json.loads(await response.get_data()) == {
+        "errors": [
+            {
+                "message": 'Cannot query field "unknown" on type "QueryRoot".',
+                "locations": [{"line": 1, "column": 3}],
+            }
+        ],
+        "extensions": {"operation": None},
+    }
+    assert "outer:execute_start" not in events
+
+
+@pytest.mark.asyncio
+async def test_mutation_via_get_is_rejected(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    response = await client.get(
+        await url_string(app, {"query": "mutation M { writeTest { test } }"})
+    )
+    assert response.status_code == 405
+    assert json.loads(await response.get_data()) == {
+        "errors": [
+            {"message": "Can only perform a mutation operation from a POST request."}
+        ]
+    }
+
+
+@pytest.mark.asyncio
+async def test_handles_field_errors_and_batches(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    response = await client.post(
+        await url_string(app, {}),
+        json=[{"query": "{thrower}"}, {"query": "{test}", "operationName": None}],
+    )
+    assert response.status_code == 200
+    assert json.loads(await response.get_data()) == [
+        {
+            "data": None,
+            "errors": [
+                {
+                    "locations": [{"column": 2, "line": 1}],
+                    "path": ["thrower"],
+                    "message": "Throws!",
+                }
+            ],
+            "extensions": {"operation": None},
+        },
+        {"data": {"test": "Hello World"}, "extensions": {"operation": None}},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_handles_missing_query(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    response = await client.get(await url_string(app, {}))
+    assert response.status_code == 400
+    assert json.loads(await response.get_data()) == {
+        "errors": [{"message": "Must provide query string."}]
+    }
+
+
+class RequestIdExtension(Extension):
+    def __init__(self):
+        self.count = 0
+
+    async def on_request_start(self, context):
+        context.extensions["requestId"] = self.count
+        self.count += 1
+
+    def get_results(self, context):
+        return {"requestId": context.extensions["requestId"]}
+
+
+@pytest.mark.asyncio
+async def test_cached_responses_are_not_replayed_with_extensions() -> typing.NoReturn:
+    extension = RequestIdExtension()
+    app = create_app(
+        extensions=[extension],
+        cache_introspection=True,
+        response_cache=MemoryCache(),
+    )
+    client = app.test_client()
+    for query in ["{ __schema { queryType { name } } }", "{ test }"]:
+        url = "/graphql?" + urlencode({"query": query})
+        for request_id in range(2):
+            response = await client.get(url)
+            extensions = json.loads(await response.get_data())["extensions"]
+            assert extensions == {"requestId": request_id}
+        extension.count = 0
+
+
+async def resolve_slow(obj, info):
+    await asyncio.sleep(0.01)
+    return "slow"
+
+
+SlowSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="SlowQuery",
+        fields={"slow": GraphQLField(GraphQLString, resolver=resolve_slow)},
+    )
+)
+
+
+@pytest.mark.asyncio
+async def test_requests_are_not_coalesced_with_extensions() -> typing.NoReturn:
+    extension = RequestIdExtension()
+    app = create_app(
+        schema=SlowSchema,
+        extensions=[extension],
+        enable_async=True,
+        deduplicate=True,
+    )
+    client = app.test_client()
+    url = "/graphql?" + urlencode({"query": "{ slow }"})
+    responses = await asyncio.gather(*[client.get(url) for _ in range(3)])
+    request_ids = [
+        json.loads(await response.get_data())["extensions"]["requestId"]
+        for response in responses
+    ]
+    assert sorted(request_ids) == [0, 1, 2]
@@ -45,6 +45,20 @@ async def test_allows_get_with_query_param(
         assert (await response_json(response)) == {"data": {"test": "Hello World"}}
 
 
+@pytest.mark.asyncio
+async def test_get_ignores_request_body(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    async with app.test_request_context("/"):
+        response = await client.get(
+            await url_string(app, {"query": "{test}"}),
+            data=json.dumps({"query": "{ test(who: \"Body\") }"}),
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == 200
+        assert (await response_json(response)) == {"data": {"test": "Hello World"}}
+
+
 @pytest.mark.asyncio
 async def test_allows_get_with_variable_values(
     app: Quart, client: QuartClient
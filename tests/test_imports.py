@@ -0,0 +1,38 @@
+import subprocess
+import sys
+import typing
+
+import pytest
+
+import quart_graphql
+
+
+def get_loaded_modules(statement):
+    script = "import sys\n{}\nprint(' '.join(sorted(sys.modules)))".format(statement)
+    output = subprocess.check_output([sys.executable, "-c", script])
+    return set(output.decode("utf8").split())
+
+
+def test_package_import_is_lazy() -> typing.NoReturn:
+    loaded = get_loaded_modules("import quart_graphql")
+    assert "quart" not in loaded
+    assert "graphql" not in loaded
+    assert "quart_graphql.graphqlview" not in loaded
+
+
+def test_view_import_skips_graphiql_and_blueprint() -> typing.NoReturn:
+    loaded = get_loaded_modules("from quart_graphql import AsyncGraphQLView")
+    assert "quart_graphql.graphqlview" in loaded
+    assert "quart_graphql.render_graphiql" not in loaded
+    assert "quart_graphql.blueprint" not in loaded
+
+
+def test_lazy_attributes() -> typing.NoReturn:
+    from quart_graphql.blueprint import GraphQL
+    from quart_graphql.graphqlview import AsyncGraphQLView
+
+    assert quart_graphql.AsyncGraphQLView is AsyncGraphQLView
+    assert quart_graphql.GraphQL is GraphQL
+    assert set(quart_graphql.__all__) <= set(dir(quart_graphql))
+    with pytest.raises(AttributeError):
+        quart_graphql.Missing
@@ -0,0 +1,106 @@
+import json
+import typing
+from urllib.parse import urlencode
+
+import pytest
+from graphql.utils.introspection_query import introspection_query
+from quart import Quart, url_for
+from quart.testing import QuartClient
+
+from quart_graphql.introspection import IntrospectionCache, is_introspection_query
+from tests.app import create_app
+from tests.schema import Schema
+
+introspection_cache = IntrospectionCache()
+
+
+@pytest.fixture
+async def app() -> Quart:
+    app = create_app(cache_introspection=True, introspection_cache=introspection_cache)
+    ctx = app.app_context()
+    await ctx.push()
+    return app
+
+
+@pytest.fixture
+def client(app: Quart) -> QuartClient:
+    return app.test_client()
+
+
+async def url_string(app: Quart, url_params: typing.Dict) -> str:
+    async with app.test_request_context("/"):
+        string = url_for("graphql")
+        if url_params:
+            string += "?" + urlencode(url_params)
+        return string
+
+
+def test_detects_introspection_queries() -> typing.NoReturn:
+    assert is_introspection_query(introspection_query)
+    assert is_introspection_query('{ __type(name: "QueryRoot") { name } }')
+    assert is_introspection_query(
+        "query A { ...F } fragment F on QueryRoot { __schema { types { name } } }"
+    )
+    assert not is_introspection_query("{ test }")
+    assert not is_introspection_query("{ __schema { types { name } } test }")
+    assert not is_introspection_query("{ __schema ")
+
+
+@pytest.mark.asyncio
+async def test_serves_cached_introspection_response(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    introspection_cache.clear()
+    async with app.test_request_context("/"):
+        first = await client.post(
+            await url_string(app, {}), json={"query": introspection_query}
+        )
+        assert first.status_code == 200
+        assert (
+            introspection_cache.get(Schema, (introspection_query, None, None, False))
+            == await first.get_data()
+        )
+
+        second = await client.post(
+            await url_string(app, {}), json={"query": introspection_query}
+        )
+        assert second.status_code == 200
+        assert await second.get_data() == await first.get_data()
+        assert "__schema" in json.loads(await second.get_data())["data"]
+
+
+@pytest.mark.asyncio
+async def test_does_not_cache_regular_queries(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    introspection_cache.clear()
+    async with app.test_request_context("/"):
+        response = await client.get(await url_string(app, {"query": "{test}"}))
+        assert response.status_code == 200
+        assert introspection_cache.get(Schema, ("{test}", None, None, False)) is None
+
+
+def test_cache_is_kept_per_schema() -> typing.NoReturn:
+    cache = IntrospectionCache()
+    cache.set(Schema, ("query", None, False), b"{}")
+    assert cache.get(Schema, ("query", None, False)) == b"{}"
+    assert cache.get(object(), ("query", None, False)) is None
+    assert cache.get(Schema, ("query", None, False)) == b"{}"
+    cache.invalidate(Schema)
+    assert cache.get(Schema, ("query", None, False)) is None
+
+
+@pytest.mark.asyncio
+async def test_introspection_cache_is_disabled_by_default() -> typing.NoReturn:
+    cache = IntrospectionCache()
+    app = create_app(introspection_cache=cache)
+    client = app.test_client()
+    async with app.test_request_context("/"):
+        response = await client.get(
+            await url_string(app, {"query": "{ __schema { queryType { name } } }"})
+        )
+        assert response.status_code == 200
+        assert json.loads(await response.get_data()) == {
+            "data": {"__schema": {"queryType": {"name": "QueryRoot"}}}
+        }
+        assert len(cache._responses) == 0
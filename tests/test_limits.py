@@ -0,0 +1,141 @@
+import json
+import typing
+from urllib.parse import urlencode
+
+import pytest
+from graphql.type.definition import (
+    GraphQLArgument,
+    GraphQLField,
+    GraphQLList,
+    GraphQLObjectType,
+)
+from graphql.type.scalars import GraphQLInt, GraphQLString
+from graphql.type.schema import GraphQLSchema
+
+from quart_graphql.limits import (
+    ResultLimits,
+    ResultUsageExtension,
+    measure_value,
+)
+from tests.app import create_app
+
+resolved = []
+
+
+def resolve_items(obj, info, count=3):
+    resolved.append(count)
+    return [{"id": index, "name": "item %d" % index} for index in range(count)]
+
+
+Item = GraphQLObjectType(
+    name="Item",
+    fields={"id": GraphQLField(GraphQLInt), "name": GraphQLField(GraphQLString)},
+)
+
+Schema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "items": GraphQLField(
+                GraphQLList(Item),
+                args={"count": GraphQLArgument(GraphQLInt)},
+                resolver=resolve_items,
+            ),
+            "tags": GraphQLField(
+                GraphQLList(GraphQLString), resolver=lambda *_: ["a"] * 100
+            ),
+        },
+    )
+)
+
+
+def url(query, **kwargs):
+    return "/graphql?" + urlencode(dict(kwargs, query=query))
+
+
+async def get_json(app, query, **kwargs):
+    response = await app.test_client().get(url(query, **kwargs))
+    return response.status_code, json.loads(await response.get_data())
+
+
+def test_measure_value() -> typing.NoReturn:
+    assert measure_value("abc") == (0, 5)
+    assert measure_value({"id": 1}) == (0, 2)
+    assert measure_value(["ab", None, [1, 2]]) == (5, 4 + 4 + 5 + 19)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("options", [{}, {"compile_middleware": True}])
+async def test_result_within_limits(options) -> typing.NoReturn:
+    app = create_app(
+        schema=Schema,
+        result_limits=ResultLimits(max_nodes=100, max_bytes=1000),
+        extensions=[ResultUsageExtension()],
+        middleware=[lambda next, *args, **kwargs: next(*args, **kwargs)],
+        **options
+    )
+    status_code, result = await get_json(app, "{ items { id name } }")
+    assert status_code == 200
+    assert len(result["data"]["items"]) == 3
+    usage = result["extensions"]["resultUsage"]
+    # items, 3 list entries and 2 fields for each of them.
+    assert usage["nodes"] == 10
+    assert usage["exceeded"] is None
+
+
+@pytest.mark.asyncio
+async def test_aborts_when_nodes_exceed_limit() -> typing.NoReturn:
+    del resolved[:]
+    app = create_app(schema=Schema, result_limits=ResultLimits(max_nodes=50))
+    status_code, result = await get_json(
+        app, "{ items(count: 1000) { id name } more: items { id } }"
+    )
+    assert status_code == 200
+    assert result == {
+        "errors": [
+            {
+                "message": "Result exceeds the limit of 50 nodes.",
+                "extensions": {
+                    "code": "RESULT_TOO_LARGE",
+                    "maxNodes": 50,
+                    "maxBytes": None,
+                },
+            }
+        ],
+        "data": None,
+    }
+    # The remaining fields were not resolved.
+    assert resolved == [1000]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fast_serialization", [False, True])
+async def test_aborts_when_bytes_exceed_limit(fast_serialization) -> typing.NoReturn:
+    app = create_app(
+        schema=Schema,
+        result_limits=ResultLimits(max_bytes=300),
+        fast_serialization=fast_serialization,
+        compile_middleware=True,
+    )
+    status_code, result = await get_json(app, "{ tags }")
+    assert result["errors"][0]["message"] == "Result exceeds the limit of 300 bytes."
+    assert result["data"] is None
+
+    status_code, result = await get_json(app, "{ items { name } }")
+    assert result == {"data": {"items": [{"name": "item %d" % i} for i in range(3)]}}
+
+
+@pytest.mark.asyncio
+async def test_checks_encoded_size() -> typing.NoReturn:
+    app = create_app(
+        schema=Schema, result_limits=ResultLimits(max_bytes=100), batch=True
+    )
+    response = await app.test_client().post(
+        "/graphql",
+        data=json.dumps([{"query": "{ items { id } }"}] * 3),
+        headers={"Content-Type": "application/json"},
+    )
+    result = json.loads(await response.get_data())
+    assert len(result) == 3
+    assert all(entry["data"] is None for entry in result)
+    assert result[0]["errors"][0]["extensions"]["code"] == "RESULT_TOO_LARGE"
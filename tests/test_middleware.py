@@ -0,0 +1,88 @@
+import json
+import typing
+
+import pytest
+from graphql import graphql
+from graphql.type.definition import GraphQLField, GraphQLObjectType
+from graphql.type.scalars import GraphQLString
+from graphql.type.schema import GraphQLSchema
+
+from quart_graphql.middleware import (
+    CompiledMiddleware,
+    compile_middleware,
+    skip_middleware,
+)
+from tests.app import create_app
+
+seen = []
+
+
+def recording_middleware(next, root, info, **args):
+    seen.append(info.field_name)
+    return next(root, info, **args)
+
+
+def uppercase_middleware(next, root, info, **args):
+    result = next(root, info, **args)
+    return result.upper() if isinstance(result, str) else result
+
+
+@skip_middleware
+def resolve_skipped(obj, info):
+    return "skipped"
+
+
+Item = GraphQLObjectType(name="Item", fields={"name": GraphQLField(GraphQLString)})
+
+Schema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "item": GraphQLField(Item, resolver=lambda *_: {"name": "item"}),
+            "hello": GraphQLField(GraphQLString, resolver=lambda *_: "hello"),
+            "skipped": GraphQLField(GraphQLString, resolver=resolve_skipped),
+        },
+    )
+)
+
+
+def test_compiled_middleware_skips_opted_out_resolvers() -> typing.NoReturn:
+    del seen[:]
+    result = graphql(
+        Schema,
+        "{ item { name } hello skipped }",
+        middleware=compile_middleware([recording_middleware]),
+    )
+    assert not result.errors
+    assert result.data == {
+        "item": {"name": "item"},
+        "hello": "hello",
+        "skipped": "skipped",
+    }
+    assert sorted(seen) == ["hello", "item", "name"]
+
+
+def test_compiled_middleware_can_skip_default_resolvers() -> typing.NoReturn:
+    del seen[:]
+    middleware = CompiledMiddleware(recording_middleware, skip_default_resolvers=True)
+    result = graphql(Schema, "{ item { name } }", middleware=middleware)
+    assert not result.errors
+    assert sorted(seen) == ["item"]
+
+
+def test_compiled_chain_is_reused_across_executions() -> typing.NoReturn:
+    middleware = compile_middleware([recording_middleware])
+    graphql(Schema, "{ hello }", middleware=middleware)
+    resolvers = dict(middleware._cached_resolvers)
+    graphql(Schema, "{ hello }", middleware=middleware)
+    assert middleware._cached_resolvers == resolvers
+    assert compile_middleware(middleware) is middleware
+    assert compile_middleware(None) is None
+
+
+@pytest.mark.asyncio
+async def test_view_compiles_middleware() -> typing.NoReturn:
+    app = create_app(middleware=[uppercase_middleware], compile_middleware=True)
+    response = await app.test_client().get("/graphql?query={test}")
+    assert response.status_code == 200
+    assert json.loads(await response.get_data()) == {"data": {"test": "HELLO WORLD"}}
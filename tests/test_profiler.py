@@ -0,0 +1,105 @@
+import os
+import time
+import typing
+from urllib.parse import urlencode
+
+import pytest
+from graphql.type.definition import GraphQLArgument, GraphQLField, GraphQLObjectType
+from graphql.type.scalars import GraphQLInt, GraphQLString
+from graphql.type.schema import GraphQLSchema
+
+from quart_graphql.profiler import (
+    FileSink,
+    ProfileSink,
+    Profiler,
+    get_variables_shape,
+)
+from tests.app import create_app
+
+
+def resolve_slow(obj, info, seconds=0):
+    time.sleep(seconds / 1000)
+    return "done"
+
+
+Schema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "slow": GraphQLField(
+                GraphQLString,
+                args={"seconds": GraphQLArgument(GraphQLInt)},
+                resolver=resolve_slow,
+            )
+        },
+    )
+)
+
+QUERY = "query Slow($ms: Int) { slow(seconds: $ms) }"
+
+
+class ListSink(ProfileSink):
+    def __init__(self):
+        self.reports = []
+
+    async def write(self, report):
+        self.reports.append(report)
+
+
+def url(ms):
+    return "/graphql?" + urlencode({"query": QUERY, "variables": '{"ms": %d}' % ms})
+
+
+def test_variables_shape() -> typing.NoReturn:
+    assert get_variables_shape(
+        {"id": 1, "filter": {"name": "x", "tags": ["a", "b"]}, "after": None}
+    ) == {"id": "int", "filter": {"name": "str", "tags": ["str"]}, "after": None}
+
+
+def test_threshold_requires_stack_mode() -> typing.NoReturn:
+    with pytest.raises(ValueError):
+        Profiler(ListSink(), threshold=1, mode="cprofile")
+
+
+@pytest.mark.asyncio
+async def test_profiles_requests_with_header() -> typing.NoReturn:
+    sink = ListSink()
+    profiler = Profiler(sink, header="X-Profile", mode="cprofile")
+    app = create_app(schema=Schema, profiler=profiler)
+    client = app.test_client()
+
+    response = await client.get(url(0))
+    assert response.status_code == 200
+    assert sink.reports == []
+
+    response = await client.get(url(0), headers={"X-Profile": "1"})
+    assert response.status_code == 200
+    report = sink.reports[0]
+    assert report.trigger == "header"
+    assert report.operation_name is None
+    assert report.variables_shape == {"ms": "int"}
+    assert report.signature.signature == "query Slow($ms:Int){slow(seconds:$ms)}"
+    assert "(resolve_slow)" in report.format_stats(limit=None)
+
+
+@pytest.mark.asyncio
+async def test_samples_slow_requests(tmp_path) -> typing.NoReturn:
+    sink = ListSink()
+    profiler = Profiler(sink, threshold=0.05, interval=0.001)
+    app = create_app(schema=Schema, profiler=profiler)
+    client = app.test_client()
+
+    await client.get(url(0))
+    assert sink.reports == []
+
+    await client.get(url(100))
+    report = sink.reports[0]
+    assert report.trigger == "threshold"
+    assert report.duration >= 0.1
+    assert report.profile is None
+    stack, count = report.stacks.most_common(1)[0]
+    assert "test_profiler.py:resolve_slow" in stack
+
+    name = await FileSink(str(tmp_path)).write(report)
+    assert os.path.exists(name + ".folded")
+    assert os.path.exists(name + ".json")
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import typing
+from urllib.parse import urlencode
+
+import pytest
+from graphql.language.parser import parse
+from graphql.type.definition import GraphQLField, GraphQLObjectType
+from graphql.type.scalars import GraphQLString
+from graphql.type.schema import GraphQLSchema
+
+from quart_graphql.cache import MemoryCache
+from quart_graphql.ratelimit import (
+    CacheTokenStorage,
+    MemoryTokenStorage,
+    RateLimiter,
+    get_query_cost,
+)
+from tests.app import create_app
+
+
+class Clock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_query_cost() -> typing.NoReturn:
+    assert get_query_cost(parse("{ test }")) == 1
+    assert get_query_cost(parse("{ a { b c } }")) == 3
+    assert get_query_cost(parse("{ a(first: 5) { b c } }")) == 11
+    assert get_query_cost(parse("query ($n: Int) { a(limit: $n) { b } }")) == 11
+    assert (
+        get_query_cost(
+            parse("{ a(first: 2) { ...F ... on A { c } } } fragment F on A { b }")
+        )
+        == 5
+    )
+    assert get_query_cost(parse("query A { a } query B { a b }"), "B") == 2
+
+
+@pytest.fixture(params=["memory", "cache"])
+def storage(request):
+    clock = Clock()
+    if request.param == "memory":
+        return MemoryTokenStorage(clock=clock), clock
+    return CacheTokenStorage(MemoryCache(), clock=clock), clock
+
+
+@pytest.mark.asyncio
+async def test_token_bucket(storage) -> typing.NoReturn:
+    storage, clock = storage
+    assert await storage.consume("a", 8, 2.0, 10) == (True, 2)
+    assert await storage.consume("a", 3, 2.0, 10) == (False, 2)
+    assert await storage.consume("b", 3, 2.0, 10) == (True, 7)
+
+    clock.now = 1.0
+    assert await storage.consume("a", 3, 2.0, 10) == (True, 1)
+    clock.now = 100.0
+    assert await storage.consume("a", 0, 2.0, 10) == (True, 10)
+
+
+@pytest.mark.asyncio
+async def test_memory_storage_is_bounded() -> typing.NoReturn:
+    storage = MemoryTokenStorage(max_keys=2)
+    for key in "abc":
+        await storage.consume(key, 1, 1.0, 10)
+    assert len(storage) == 2
+
+
+@pytest.mark.asyncio
+async def test_view_rejects_clients_over_limit() -> typing.NoReturn:
+    clock = Clock()
+    limiter = RateLimiter(
+        identify=lambda context: context.args.get("client"),
+        rate=1.0,
+        capacity=3,
+        storage=MemoryTokenStorage(clock=clock),
+    )
+    app = create_app(rate_limiter=limiter)
+    client = app.test_client()
+
+    def url(client_id, query="{ a: test b: test }"):
+        params = {"query": query}
+        if client_id:
+            params["client"] = client_id
+        return "/graphql?" + urlencode(params)
+
+    response = await client.get(url("x"))
+    assert response.status_code == 200
+    assert limiter.get_cached_cost("{ a: test b: test }") == 2
+
+    response = await client.get(url("x"))
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert json.loads(await response.get_data()) == {
+        "errors": [{"message": "Rate limit exceeded."}]
+    }
+
+    response = await client.get(url("y"))
+    assert response.status_code == 200
+    response = await client.get(url(None))
+    assert response.status_code == 200
+
+    clock.now = 1.0
+    response = await client.get(url("x"))
+    assert response.status_code == 200
+
+    response = await client.get(url("x", "{ a: test b: test c: test d: test }"))
+    assert response.status_code == 400
+    assert json.loads(await response.get_data()) == {
+        "errors": [{"message": "Query cost 4 exceeds the rate limit of 3."}]
+    }
+
+
+def create_limiter(clock):
+    return RateLimiter(
+        identify=lambda context: context.args.get("client"),
+        rate=1.0,
+        capacity=3,
+        storage=MemoryTokenStorage(clock=clock),
+    )
+
+
+def url(client_id, query="{ a: test b: test }"):
+    return "/graphql?" + urlencode({"query": query, "client": client_id})
+
+
+@pytest.mark.asyncio
+async def test_view_charges_cached_responses() -> typing.NoReturn:
+    limiter = create_limiter(Clock())
+    app = create_app(rate_limiter=limiter, response_cache=MemoryCache())
+    client = app.test_client()
+
+    response = await client.get(url("x"))
+    assert response.status_code == 200
+    response = await client.get(url("y"))
+    assert response.status_code == 200
+    response = await client.get(url("x"))
+    assert response.status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_view_charges_every_coalesced_request() -> typing.NoReturn:
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def resolve_slow(obj, info):
+        started.set()
+        await release.wait()
+        return "slow"
+
+    schema = GraphQLSchema(
+        GraphQLObjectType(
+            name="Query",
+            fields={"slow": GraphQLField(GraphQLString, resolver=resolve_slow)},
+        )
+    )
+    clock = Clock()
+    limiter = create_limiter(clock)
+    app = create_app(
+        schema=schema, rate_limiter=limiter, enable_async=True, deduplicate=True
+    )
+    client = app.test_client()
+    query = "{ a: slow b: slow }"
+    await limiter.storage.consume("x", 2, limiter.rate, limiter.capacity)
+
+    leader = asyncio.ensure_future(client.get(url("y", query)))
+    await started.wait()
+    follower = asyncio.ensure_future(client.get(url("x", query)))
+    await asyncio.sleep(0.01)
+    release.set()
+
+    response = await leader
+    assert json.loads(await response.get_data()) == {"data": {"a": "slow", "b": "slow"}}
+    response = await follower
+    assert response.status_code == 429
+    allowed, _ = await limiter.storage.consume("y", 2, limiter.rate, limiter.capacity)
+    assert not allowed
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import typing
+from urllib.parse import urlencode
+
+import pytest
+from graphql.type.definition import GraphQLField, GraphQLObjectType
+from graphql.type.scalars import GraphQLString
+from graphql.type.schema import GraphQLSchema
+from quart import Quart
+
+from quart_graphql import AsyncGraphQLView, signature
+from quart_graphql.cache import MemoryCache, PartitionedLRU, get_document_cache_key
+from quart_graphql.introspection import IntrospectionCache
+from quart_graphql.registry import SchemaRegistry
+from quart_graphql.variables import VariablesCache
+from tests.app import create_app
+
+
+def create_schema(name):
+    return GraphQLSchema(
+        GraphQLObjectType(
+            name="Query",
+            fields={"tenant": GraphQLField(GraphQLString, resolver=lambda *_: name)},
+        )
+    )
+
+
+Acme = create_schema("acme")
+Globex = create_schema("globex")
+
+
+async def get_json(client, path, **kwargs):
+    response = await client.get(path, **kwargs)
+    return response.status_code, json.loads(await response.get_data())
+
+
+def test_partitioned_lru_evicts_from_largest_partition() -> typing.NoReturn:
+    cache = PartitionedLRU(max_entries=4)
+    cache.set("a", 1, "a1")
+    for key in range(10):
+        cache.set("b", key, "b%d" % key)
+    assert len(cache) == 4
+    assert cache.get("a", 1) == "a1"
+    assert cache.get_partition_size("b") == 3
+    assert cache.get("b", 9) == "b9"
+    assert cache.get("b", 0, "missing") == "missing"
+
+    cache.invalidate("b")
+    assert len(cache) == 1
+    assert cache.get("b", 9) is None
+
+
+def test_registry_selects_schema() -> typing.NoReturn:
+    registry = SchemaRegistry({"acme": Acme}, header="X-Tenant", default="acme")
+    with pytest.raises(ValueError):
+        registry.register("broken", object())
+    registry.register("globex", Globex)
+    assert registry.get_schema_hash(Globex) == signature.compute_schema_hash(Globex)
+    assert len(registry) == 2
+    assert "globex" in registry
+    assert registry.unregister("globex") is Globex
+    assert registry.get("globex") is None
+
+
+@pytest.mark.asyncio
+async def test_selects_schema_by_header() -> typing.NoReturn:
+    registry = SchemaRegistry(
+        {"acme": Acme, "globex": Globex}, header="X-Tenant", default="acme"
+    )
+    introspection_cache = IntrospectionCache()
+    app = create_app(
+        schema=None,
+        schema_registry=registry,
+        cache_introspection=True,
+        introspection_cache=introspection_cache,
+    )
+    client = app.test_client()
+    path = "/graphql?" + urlencode({"query": "{ tenant }"})
+
+    assert await get_json(client, path) == (200, {"data": {"tenant": "acme"}})
+    assert await get_json(client, path, headers={"X-Tenant": "globex"}) == (
+        200,
+        {"data": {"tenant": "globex"}},
+    )
+    assert await get_json(client, path, headers={"X-Tenant": "initech"}) == (
+        404,
+        {"errors": [{"message": "Unknown GraphQL schema."}]},
+    )
+
+    # Each schema keeps its own introspection responses.
+    path = "/graphql?" + urlencode({"query": "{ __schema { queryType { name } } }"})
+    await get_json(client, path)
+    await get_json(client, path, headers={"X-Tenant": "globex"})
+    assert len(introspection_cache._responses) == 2
+
+
+@pytest.mark.asyncio
+async def test_many_schemas_keep_their_hash(monkeypatch) -> typing.NoReturn:
+    schemas = {
+        "tenant%d" % index: create_schema("tenant%d" % index)
+        for index in range(signature.MAX_SCHEMA_HASHES + 8)
+    }
+    registry = SchemaRegistry(schemas, header="X-Tenant")
+    app = create_app(
+        schema=None, schema_registry=registry, document_cache=MemoryCache()
+    )
+    client = app.test_client()
+    path = "/graphql?" + urlencode({"query": "{ tenant }"})
+
+    printed = []
+    monkeypatch.setattr(signature, "print_schema", printed.append)
+    for _ in range(2):
+        for name in schemas:
+            result = await get_json(client, path, headers={"X-Tenant": name})
+            assert result == (200, {"data": {"tenant": name}})
+    assert printed == []
+
+    registry.unregister("tenant0")
+    assert registry._hashes.get(schemas["tenant0"]) is None
+
+
+@pytest.mark.asyncio
+async def test_selects_schema_by_path() -> typing.NoReturn:
+    registry = SchemaRegistry({"acme": Acme, "globex": Globex}, view_arg="tenant")
+    app = create_app(path="/<tenant>/graphql", schema_registry=registry)
+    client = app.test_client()
+    query = "?" + urlencode({"query": "{ tenant }"})
+
+    assert await get_json(client, "/globex/graphql" + query) == (
+        200,
+        {"data": {"tenant": "globex"}},
+    )
+    status_code, _ = await get_json(client, "/initech/graphql" + query)
+    assert status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_reload_swaps_schema_and_prepares_caches() -> typing.NoReturn:
+    registry = SchemaRegistry({"acme": Acme}, default="acme")
+    variables_cache = VariablesCache()
+    document_cache = MemoryCache()
+    app = create_app(
+        schema_registry=registry,
+        cache_variables=True,
+        variables_cache=variables_cache,
+        document_cache=document_cache,
+    )
+    client = app.test_client()
+    query = "query Tenant { tenant }"
+    path = "/graphql?" + urlencode({"query": query})
+
+    assert await get_json(client, path) == (200, {"data": {"tenant": "acme"}})
+    assert variables_cache._plans.keys(Acme) == [(query, None)]
+
+    Reloaded = GraphQLSchema(
+        GraphQLObjectType(
+            name="Query",
+            fields={
+                "tenant": GraphQLField(GraphQLString, resolver=lambda *_: "reloaded"),
+                "region": GraphQLField(GraphQLString),
+            },
+        )
+    )
+    assert await registry.reload("acme", Reloaded) is Acme
+    assert variables_cache._plans.keys(Acme) == []
+    assert variables_cache._plans.keys(Reloaded) == [(query, None)]
+    key = get_document_cache_key(registry.get_schema_hash(Reloaded), query)
+    assert await document_cache.get(key) is not None
+    assert await get_json(client, path) == (200, {"data": {"tenant": "reloaded"}})
+
+
+@pytest.mark.asyncio
+async def test_inflight_requests_finish_on_old_schema() -> typing.NoReturn:
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def resolve_slow(obj, info):
+        started.set()
+        await release.wait()
+        return "old"
+
+    Old = GraphQLSchema(
+        GraphQLObjectType(
+            name="Query",
+            fields={"tenant": GraphQLField(GraphQLString, resolver=resolve_slow)},
+        )
+    )
+    registry = SchemaRegistry({"acme": Old}, default="acme")
+    app = create_app(schema_registry=registry, enable_async=True)
+    client = app.test_client()
+    path = "/graphql?" + urlencode({"query": "{ tenant }"})
+
+    inflight = asyncio.ensure_future(get_json(client, path))
+    await started.wait()
+    await registry.reload("acme", create_schema("new"))
+    assert await get_json(client, path) == (200, {"data": {"tenant": "new"}})
+
+    release.set()
+    assert await inflight == (200, {"data": {"tenant": "old"}})
+
+
+@pytest.mark.asyncio
+async def test_registry_routes_keep_their_endpoint() -> typing.NoReturn:
+    app = Quart(__name__)
+    for name in ("acme", "globex"):
+        registry = SchemaRegistry({name: create_schema(name)}, default=name)
+        app.add_url_rule(
+            "/%s/graphql" % name,
+            view_func=AsyncGraphQLView.as_view(name, schema_registry=registry),
+        )
+    assert app.view_functions["acme"].__name__ == "acme"
+    assert "globex" in app.view_functions
+
+    client = app.test_client()
+    query = "?" + urlencode({"query": "{ tenant }"})
+    assert await get_json(client, "/globex/graphql" + query) == (
+        200,
+        {"data": {"tenant": "globex"}},
+    )
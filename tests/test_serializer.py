@@ -0,0 +1,306 @@
+import json
+import typing
+from urllib.parse import urlencode
+
+import pytest
+from graphql.execution import execute
+from graphql.language.parser import parse
+from graphql.type.definition import (
+    GraphQLArgument,
+    GraphQLEnumType,
+    GraphQLEnumValue,
+    GraphQLField,
+    GraphQLInterfaceType,
+    GraphQLList,
+    GraphQLNonNull,
+    GraphQLObjectType,
+)
+from graphql.type.scalars import GraphQLFloat, GraphQLInt, GraphQLString
+from graphql.type.schema import GraphQLSchema
+from graphql_server import json_encode
+from promise import Promise
+
+from quart_graphql.middleware import compile_middleware
+from quart_graphql.serializer import (
+    Fallback,
+    SerializerCache,
+    get_serialization_plan,
+)
+from tests.app import create_app
+
+Color = GraphQLEnumType(
+    name="Color",
+    values={"RED": GraphQLEnumValue(0), "BLUE": GraphQLEnumValue(1)},
+)
+
+Named = GraphQLInterfaceType(
+    name="Named",
+    fields={"name": GraphQLField(GraphQLString)},
+    resolve_type=lambda *_: Item,
+)
+
+
+def resolve_broken(obj, info):
+    raise Exception("Broken")
+
+
+class PriceValue(object):
+    def __init__(self, amount):
+        self.amount = amount
+
+    def currency(self):
+        return "EUR"
+
+
+Item = GraphQLObjectType(
+    name="Item",
+    interfaces=[Named],
+    fields=lambda: {
+        "id": GraphQLField(GraphQLNonNull(GraphQLInt)),
+        "name": GraphQLField(GraphQLString),
+        "color": GraphQLField(Color),
+        "price": GraphQLField(Price),
+        "tags": GraphQLField(GraphQLList(GraphQLString)),
+        "label": GraphQLField(
+            GraphQLString,
+            args={"prefix": GraphQLArgument(GraphQLString)},
+            resolver=lambda obj, info, prefix="": "{}{}@{}".format(
+                prefix, obj["name"], ".".join(map(str, info.path))
+            ),
+        ),
+        "broken": GraphQLField(GraphQLString, resolver=resolve_broken),
+    },
+)
+
+Price = GraphQLObjectType(
+    name="Price",
+    fields={
+        "amount": GraphQLField(GraphQLFloat),
+        "currency": GraphQLField(GraphQLString),
+    },
+)
+
+ITEMS = [
+    {
+        "id": index,
+        "name": 'item é"%d' % index,
+        "color": index % 2,
+        "price": PriceValue(index * 1.5) if index else None,
+        "tags": ["a", None],
+    }
+    for index in range(3)
+]
+
+Schema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "items": GraphQLField(GraphQLList(Item), resolver=lambda *_: ITEMS),
+            "named": GraphQLField(Named, resolver=lambda *_: ITEMS[0]),
+        },
+    ),
+    types=[Item],
+)
+
+QUERY = """
+query Items($prefix: String) {
+  items {
+    __typename
+    key: id
+    ...Fields
+    ... on Named { name }
+    label(prefix: $prefix)
+    plain: label
+  }
+}
+fragment Fields on Item { name color tags price { amount currency } }
+"""
+
+
+def encode_with_graphql_core(query, variables=None):
+    result = execute(Schema, parse(query), variables=variables)
+    assert not result.errors
+    return json_encode(result.data)
+
+
+def test_plan_matches_graphql_core() -> typing.NoReturn:
+    plan = get_serialization_plan(Schema, parse(QUERY))
+    variables = {"prefix": "> "}
+    assert plan.execute(variables=variables) == encode_with_graphql_core(
+        QUERY, variables
+    )
+    assert '"plain":"item \\u00e9\\"0@items.0.plain"' in plan.execute()
+
+
+def test_plan_falls_back_on_errors() -> typing.NoReturn:
+    plan = get_serialization_plan(Schema, parse("{ items { broken } }"))
+    with pytest.raises(Fallback):
+        plan.execute()
+
+    plan = get_serialization_plan(Schema, parse("query ($n: Int!) { items { id } }"))
+    with pytest.raises(Fallback):
+        plan.execute(variables={})
+
+
+def test_unsupported_documents() -> typing.NoReturn:
+    assert get_serialization_plan(Schema, parse("{ named { name } }")) is None
+    assert (
+        get_serialization_plan(Schema, parse("{ items { id @skip(if: true) } }"))
+        is None
+    )
+    assert (
+        get_serialization_plan(Schema, parse("{ __schema { types { name } } }")) is None
+    )
+    assert get_serialization_plan(Schema, parse("mutation { items { id } }")) is None
+
+
+def test_cache_compiles_once_per_middleware() -> typing.NoReturn:
+    cache = SerializerCache()
+    document_ast = parse(QUERY)
+    plan = cache.get_plan(Schema, QUERY, document_ast)
+    assert cache.get_plan(Schema, QUERY, document_ast) is plan
+    middleware = compile_middleware(
+        [lambda next, *args, **kwargs: next(*args, **kwargs)]
+    )
+    assert cache.get_plan(Schema, QUERY, document_ast, None, middleware) is not plan
+    assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_view_uses_fast_serialization() -> typing.NoReturn:
+    app = create_app(schema=Schema, fast_serialization=True, batch=True)
+    client = app.test_client()
+
+    response = await client.get("/graphql?" + urlencode({"query": QUERY}))
+    assert response.status_code == 200
+    assert (await response.get_data()).decode() == '{"data":%s}' % (
+        encode_with_graphql_core(QUERY)
+    )
+
+    response = await client.get(
+        "/graphql?" + urlencode({"query": "{ items { id } }", "pretty": "1"})
+    )
+    assert (await response.get_data()).decode() == json_encode(
+        {"data": {"items": [{"id": 0}, {"id": 1}, {"id": 2}]}}, pretty=True
+    )
+
+    response = await client.post(
+        "/graphql",
+        data=json.dumps(
+            [{"query": "{ items { id } }"}, {"query": "{ items { broken } }"}]
+        ),
+        headers={"Content-Type": "application/json"},
+    )
+    result = json.loads(await response.get_data())
+    assert result[0] == {"data": {"items": [{"id": 0}, {"id": 1}, {"id": 2}]}}
+    assert result[1]["data"] == {"items": [{"broken": None}] * 3}
+    assert result[1]["errors"][0]["message"] == "Broken"
+
+
+counts = {"side": 0, "promise": 0}
+
+
+def resolve_side(obj, info):
+    counts["side"] += 1
+    return "side"
+
+
+def resolve_promise(obj, info):
+    counts["promise"] += 1
+    return Promise.resolve("promise")
+
+
+async def resolve_async(obj, info):
+    return "async"
+
+
+# Number of times the flaky resolver fails before it recovers.
+flaky = {"failures": 0}
+
+
+def resolve_flaky(obj, info):
+    if flaky["failures"]:
+        flaky["failures"] -= 1
+        raise Exception("Unavailable")
+    return "flaky"
+
+
+SideEffectSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "side": GraphQLField(GraphQLString, resolver=resolve_side),
+            "promise": GraphQLField(GraphQLString, resolver=resolve_promise),
+            "async": GraphQLField(GraphQLString, resolver=resolve_async),
+            "flaky": GraphQLField(GraphQLString, resolver=resolve_flaky),
+        },
+    )
+)
+
+
+def test_async_resolvers_are_unsupported() -> typing.NoReturn:
+    assert get_serialization_plan(SideEffectSchema, parse("{ async }")) is None
+    assert get_serialization_plan(SideEffectSchema, parse("{ side }")) is not None
+
+
+@pytest.mark.asyncio
+async def test_view_disables_plans_that_keep_falling_back() -> typing.NoReturn:
+    serializer_cache = SerializerCache()
+    app = create_app(
+        schema=SideEffectSchema,
+        fast_serialization=True,
+        serializer_cache=serializer_cache,
+    )
+    client = app.test_client()
+    counts.update(side=0, promise=0)
+    query = "{ side promise }"
+
+    for _ in range(5):
+        response = await client.get("/graphql?" + urlencode({"query": query}))
+        assert json.loads(await response.get_data()) == {
+            "data": {"side": "side", "promise": "promise"}
+        }
+    # Only the first max_fallbacks requests ran the resolvers twice.
+    assert counts == {"side": 8, "promise": 8}
+    assert serializer_cache.get_plan(SideEffectSchema, query, parse(query)) is None
+
+
+def test_disabled_plans_are_retried() -> typing.NoReturn:
+    serializer_cache = SerializerCache(max_fallbacks=2, retry_after=0)
+    query = "{ side }"
+    document_ast = parse(query)
+    plan = serializer_cache.get_plan(SideEffectSchema, query, document_ast)
+    serializer_cache.record_fallback(SideEffectSchema, query)
+    assert serializer_cache.get_plan(SideEffectSchema, query, document_ast) is plan
+
+    serializer_cache.record_fallback(SideEffectSchema, query)
+    assert serializer_cache.get_plan(SideEffectSchema, query, document_ast)
+
+    serializer_cache.retry_after = 60
+    serializer_cache.record_fallback(SideEffectSchema, query)
+    assert serializer_cache.get_plan(SideEffectSchema, query, document_ast) is None
+
+    serializer_cache.invalidate(SideEffectSchema)
+    assert serializer_cache.get_plan(SideEffectSchema, query, document_ast)
+
+
+@pytest.mark.asyncio
+async def test_view_keeps_plans_after_transient_fallbacks() -> typing.NoReturn:
+    serializer_cache = SerializerCache()
+    app = create_app(
+        schema=SideEffectSchema,
+        fast_serialization=True,
+        serializer_cache=serializer_cache,
+    )
+    client = app.test_client()
+    query = "{ side flaky }"
+
+    for failures in (1, 2, 1):
+        flaky["failures"] = failures
+        response = await client.get("/graphql?" + urlencode({"query": query}))
+        assert json.loads(await response.get_data())["data"]["side"] == "side"
+        response = await client.get("/graphql?" + urlencode({"query": query}))
+        assert json.loads(await response.get_data()) == {
+            "data": {"side": "side", "flaky": "flaky"}
+        }
+    assert serializer_cache.get_plan(SideEffectSchema, query, parse(query))
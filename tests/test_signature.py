@@ -0,0 +1,82 @@
+import json
+import typing
+
+import pytest
+
+from quart_graphql.cache import MemoryCache
+from quart_graphql.extensions import Extension
+from quart_graphql.signature import SignatureCache, get_query_signature
+from tests.app import create_app
+
+
+def test_normalizes_whitespace_and_comments() -> typing.NoReturn:
+    signature = get_query_signature(
+        """
+        # a comment
+        query Hello($who: String = "World") {
+          test(who: $who)
+        }
+        """
+    )
+    assert signature.normalized == 'query Hello($who:String="World"){test(who:$who)}'
+
+
+def test_signature_ignores_order_and_literals() -> typing.NoReturn:
+    first = get_query_signature(
+        'query A { b: test(who: "x") @include(if: true) ...F } '
+        "fragment F on QueryRoot { thrower request } "
+        "fragment Unused on QueryRoot { context }",
+        "A",
+    )
+    second = get_query_signature(
+        'query A { ...F b: test(who: "y") @include(if: false) } '
+        "fragment F on QueryRoot { request thrower }",
+        "A",
+    )
+    assert first.signature == (
+        "query A{...F b:test(who:$_0) @include(if:$_1)} "
+        "fragment F on QueryRoot{request thrower}"
+    )
+    assert first.hash == second.hash
+    assert first.normalized != second.normalized
+
+
+def test_signature_keeps_selected_operation_only() -> typing.NoReturn:
+    query = "query A { test } query B { request }"
+    assert get_query_signature(query, "B").signature == "query B{request}"
+    assert get_query_signature(query, "A").hash != get_query_signature(query, "B").hash
+
+
+def test_signature_cache_is_bounded() -> typing.NoReturn:
+    cache = SignatureCache(max_entries=2)
+    first = cache.get("{ test }")
+    assert cache.get("{ test }") is first
+    cache.get("{ request }")
+    cache.get("{ context }")
+    assert len(cache) == 2
+
+
+class SignatureExtension(Extension):
+    def get_results(self, context):
+        return {"signature": context.signature.hash}
+
+
+@pytest.mark.asyncio
+async def test_view_exposes_signature_to_extensions() -> typing.NoReturn:
+    app = create_app(normalize_queries=True, extensions=[SignatureExtension()])
+    response = await app.test_client().get("/graphql?query={ test }")
+    assert response.status_code == 200
+    assert json.loads(await response.get_data()) == {
+        "data": {"test": "Hello World"},
+        "extensions": {"signature": get_query_signature("{test}").hash},
+    }
+
+
+@pytest.mark.asyncio
+async def test_response_cache_key_uses_normalized_query() -> typing.NoReturn:
+    app = create_app(normalize_queries=True, response_cache=MemoryCache())
+    client = app.test_client()
+    response = await client.get("/graphql?query={ request }&q=first")
+    assert json.loads(await response.get_data()) == {"data": {"request": "first"}}
+    response = await client.get("/graphql?query=%7Brequest%7D&q=second")
+    assert json.loads(await response.get_data()) == {"data": {"request": "first"}}
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import typing
+from urllib.parse import urlencode
+
+import pytest
+from graphql.type.definition import GraphQLArgument, GraphQLField, GraphQLObjectType
+from graphql.type.scalars import GraphQLString
+from graphql.type.schema import GraphQLSchema
+from quart import Quart, url_for
+from quart.testing import QuartClient
+
+from quart_graphql.singleflight import SingleFlight
+from tests.app import create_app
+
+calls = []
+
+
+async def resolve_slow(obj, info, who="World"):
+    calls.append(who)
+    await asyncio.sleep(0.05)
+    return "Hello %s" % who
+
+
+SlowSchema = GraphQLSchema(
+    GraphQLObjectType(
+        name="SlowQuery",
+        fields={
+            "slow": GraphQLField(
+                GraphQLString,
+                args={"who": GraphQLArgument(GraphQLString)},
+                resolver=resolve_slow,
+            )
+        },
+    )
+)
+
+
+@pytest.fixture
+async def app() -> Quart:
+    app = create_app(schema=SlowSchema, enable_async=True, deduplicate=True)
+    ctx = app.app_context()
+    await ctx.push()
+    return app
+
+
+@pytest.fixture
+def client(app: Quart) -> QuartClient:
+    return app.test_client()
+
+
+async def url_string(app: Quart, url_params: typing.Dict) -> str:
+    async with app.test_request_context("/"):
+        return url_for("graphql") + "?" + urlencode(url_params)
+
+
+@pytest.mark.asyncio
+async def test_coalesces_identical_concurrent_queries(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    del calls[:]
+    url = await url_string(app, {"query": "{ slow }"})
+    responses = await asyncio.gather(*[client.get(url) for _ in range(5)])
+
+    assert calls == ["World"]
+    for response in responses:
+        assert response.status_code == 200
+        assert json.loads(await response.get_data()) == {
+            "data": {"slow": "Hello World"}
+        }
+
+
+@pytest.mark.asyncio
+async def test_distinct_variables_are_not_coalesced(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    del calls[:]
+    query = "query Slow($who: String) { slow(who: $who) }"
+    responses = await asyncio.gather(
+        client.get(
+            await url_string(
+                app, {"query": query, "variables": json.dumps({"who": "Dolly"})}
+            )
+        ),
+        client.get(
+            await url_string(
+                app, {"query": query, "variables": json.dumps({"who": "You"})}
+            )
+        ),
+    )
+
+    assert sorted(calls) == ["Dolly", "You"]
+    assert [json.loads(await response.get_data()) for response in responses] == [
+        {"data": {"slow": "Hello Dolly"}},
+        {"data": {"slow": "Hello You"}},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sequential_queries_are_executed_again(
+    app: Quart, client: QuartClient
+) -> typing.NoReturn:
+    del calls[:]
+    url = await url_string(app, {"query": "{ slow }"})
+    await client.get(url)
+    await client.get(url)
+    assert calls == ["World", "World"]
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_with_waiters() -> typing.NoReturn:
+    inflight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        inflight.do("key", fail), inflight.do("key", fail), return_exceptions=True
+    )
+    assert [str(result) for result in results] == ["boom", "boom"]
+    assert len(inflight) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelling_the_first_caller_keeps_waiters_running() -> typing.NoReturn:
+    inflight = SingleFlight()
+    started = asyncio.Event()
+    executions = []
+
+    async def slow():
+        executions.append(1)
+        started.set()
+        await asyncio.sleep(0.01)
+        return "done"
+
+    leader = asyncio.ensure_future(inflight.do("key", slow))
+    await started.wait()
+    follower = asyncio.ensure_future(inflight.do("key", slow))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == "done"
+    assert leader.cancelled()
+    assert executions == [1]
+    assert len(inflight) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_context_is_closed_after_execution() -> typing.NoReturn:
+    started = asyncio.Event()
+    release = asyncio.Event()
+    events = []
+
+    async def resolve_shared(obj, info):
+        info.context.add_cleanup(lambda: events.append("closed"))
+        started.set()
+        await release.wait()
+        events.append("resolved")
+        return "shared"
+
+    schema = GraphQLSchema(
+        GraphQLObjectType(
+            name="SharedQuery",
+            fields={"shared": GraphQLField(GraphQLString, resolver=resolve_shared)},
+        )
+    )
+    app = create_app(schema=schema, enable_async=True, deduplicate=True)
+    client = app.test_client()
+    url = "/graphql?" + urlencode({"query": "{ shared }"})
+
+    leader = asyncio.ensure_future(client.get(url))
+    await started.wait()
+    follower = asyncio.ensure_future(client.get(url))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    await asyncio.sleep(0.01)
+    assert events == []
+
+    release.set()
+    response = await follower
+    assert json.loads(await response.get_data()) == {"data": {"shared": "shared"}}
+    await asyncio.sleep(0.01)
+    assert events == ["resolved", "closed"]
@@ -0,0 +1,130 @@
+import json
+import typing
+from urllib.parse import urlencode
+
+import pytest
+from graphql import graphql
+from graphql.language.parser import parse
+from graphql.type.definition import (
+    GraphQLArgument,
+    GraphQLField,
+    GraphQLInputObjectField,
+    GraphQLInputObjectType,
+    GraphQLObjectType,
+)
+from graphql.type.scalars import GraphQLFloat, GraphQLInt, GraphQLString
+from graphql.type.schema import GraphQLSchema
+from graphql_server import HttpQueryError
+
+from quart_graphql.variables import (
+    VariablesCache,
+    execute_with_plan,
+    get_coercion_plan,
+)
+from tests.app import create_app
+
+Point = GraphQLInputObjectType(
+    name="Point", fields={"x": GraphQLInputObjectField(GraphQLInt)}
+)
+
+Schema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "echo": GraphQLField(
+                GraphQLString,
+                args={
+                    "text": GraphQLArgument(GraphQLString),
+                    "times": GraphQLArgument(GraphQLInt),
+                    "scale": GraphQLArgument(GraphQLFloat),
+                },
+                resolver=lambda obj, info, text="", times=1, scale=1.0: "{}:{}".format(
+                    text * times, repr(scale)
+                ),
+            ),
+            "point": GraphQLField(
+                GraphQLInt,
+                args={"point": GraphQLArgument(Point)},
+                resolver=lambda obj, info, point: point["x"],
+            ),
+        },
+    )
+)
+
+QUERY = "query Echo($text: String!, $times: Int = 2, $scale: Float) { echo(text: $text, times: $times, scale: $scale) }"
+
+
+def test_plan_coerces_simple_variables() -> typing.NoReturn:
+    plan = get_coercion_plan(Schema, parse(QUERY))
+    assert plan.coerce({"text": "a", "scale": 2}) == {
+        "text": "a",
+        "times": 2,
+        "scale": 2.0,
+    }
+    assert plan.document_ast.definitions[0].variable_definitions is None
+
+    result = execute_with_plan(Schema, plan, plan.coerce({"text": "a", "times": 3}))
+    assert not result.errors
+    assert result.data == {"echo": "aaa:1.0"}
+    assert (
+        result.data == graphql(Schema, QUERY, variables={"text": "a", "times": 3}).data
+    )
+
+
+def test_plan_defers_values_it_cannot_vouch_for() -> typing.NoReturn:
+    plan = get_coercion_plan(Schema, parse(QUERY))
+    assert plan.coerce({}) is None
+    assert plan.coerce({"text": 1}) is None
+    assert plan.coerce({"text": "a", "times": True}) is None
+    assert plan.coerce({"text": "a", "times": 2**40}) is None
+
+
+def test_no_plan_for_complex_variables() -> typing.NoReturn:
+    query = "query ($point: Point) { point(point: $point) }"
+    assert get_coercion_plan(Schema, parse(query)) is None
+    assert get_coercion_plan(Schema, parse("{ echo }")) is None
+
+
+def test_cache_memoizes_plans_and_payloads() -> typing.NoReturn:
+    cache = VariablesCache(max_entries=1, max_payloads=1)
+    plan = cache.get_plan(Schema, QUERY, parse(QUERY))
+    assert cache.get_plan(Schema, QUERY, parse(QUERY)) is plan
+    cache.get_plan(Schema, "{ echo }", parse("{ echo }"))
+    assert len(cache) == 1
+
+    payload = cache.load('{"text": "a"}')
+    assert payload == {"text": "a"}
+    assert cache.load('{"text": "a"}') is payload
+    assert cache.load({"text": "b"}) == {"text": "b"}
+    with pytest.raises(HttpQueryError):
+        cache.load("{")
+
+
+@pytest.mark.asyncio
+async def test_view_executes_with_cached_variables() -> typing.NoReturn:
+    app = create_app(schema=Schema, cache_variables=True)
+    client = app.test_client()
+    url = "/graphql?" + urlencode(
+        {"query": QUERY, "variables": json.dumps({"text": "b", "scale": 0.5})}
+    )
+    for _ in range(2):
+        response = await client.get(url)
+        assert response.status_code == 200
+        assert json.loads(await response.get_data()) == {"data": {"echo": "bb:0.5"}}
+
+    response = await client.get(
+        "/graphql?" + urlencode({"query": QUERY, "variables": "{}"})
+    )
+    assert response.status_code == 400
+    result = json.loads(await response.get_data())
+    assert result["errors"][0]["message"] == (
+        'Variable "$text" of required type "String!" was not provided.'
+    )
+
+    response = await client.get(
+        "/graphql?" + urlencode({"query": QUERY, "variables": "{"})
+    )
+    assert response.status_code == 400
+    assert json.loads(await response.get_data()) == {
+        "errors": [{"message": "Variables are invalid JSON."}]
+    }
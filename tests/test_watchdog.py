@@ -0,0 +1,79 @@
+import asyncio
+import time
+import typing
+from urllib.parse import urlencode
+
+import pytest
+from graphql.type.definition import GraphQLField, GraphQLObjectType
+from graphql.type.scalars import GraphQLString
+from graphql.type.schema import GraphQLSchema
+
+from quart_graphql.watchdog import LoopWatchdog
+from tests.app import create_app
+
+
+def resolve_blocking(obj, info):
+    time.sleep(0.2)
+    return "done"
+
+
+Schema = GraphQLSchema(
+    GraphQLObjectType(
+        name="Query",
+        fields={
+            "blocking": GraphQLField(GraphQLString, resolver=resolve_blocking),
+            "fast": GraphQLField(GraphQLString, resolver=lambda *_: "done"),
+        },
+    )
+)
+
+
+@pytest.mark.asyncio
+async def test_reports_blocking_resolver() -> typing.NoReturn:
+    reports = []
+    watchdog = LoopWatchdog(threshold=0.05, interval=0.01, handlers=[reports.append])
+    app = create_app(schema=Schema, watchdog=watchdog)
+    client = app.test_client()
+
+    try:
+        response = await client.get("/graphql?" + urlencode({"query": "{ fast }"}))
+        assert response.status_code == 200
+        await asyncio.sleep(0.05)
+        assert reports == []
+
+        response = await client.get(
+            "/graphql?"
+            + urlencode({"query": "query Slow { blocking }", "operationName": "Slow"})
+        )
+        assert response.status_code == 200
+        await asyncio.sleep(0.05)
+    finally:
+        watchdog.stop()
+
+    assert len(reports) == 1
+    report = reports[0]
+    assert report.duration >= 0.15
+    assert report.operation_name == "Slow"
+    assert report.field == "Query.blocking"
+    assert report.path == ["blocking"]
+    assert "resolve_blocking" in report.function
+    assert "test_watchdog.py:resolve_blocking" in report.stack
+    assert watchdog.get_metrics()["blocked_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_reports_unattributed_blocking() -> typing.NoReturn:
+    reports = []
+    watchdog = LoopWatchdog(threshold=0.05, interval=0.01, handlers=[reports.append])
+    watchdog.start()
+    try:
+        await asyncio.sleep(0.02)
+        time.sleep(0.1)
+        await asyncio.sleep(0.02)
+    finally:
+        watchdog.stop()
+
+    assert len(reports) == 1
+    assert reports[0].field is None
+    assert reports[0].operation_name is None
+    assert "test_watchdog.py:test_reports_unattributed_blocking" in reports[0].stack